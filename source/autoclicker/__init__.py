@@ -0,0 +1,3 @@
+""" Core of the autoclicker that does not depend on PyQt6. """
+
+__version__ = "1.2"
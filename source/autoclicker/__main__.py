@@ -0,0 +1,5 @@
+import sys
+
+from autoclicker.cli import main
+
+sys.exit(main())
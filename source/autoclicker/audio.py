@@ -0,0 +1,120 @@
+import io
+import math
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import wave
+from array import array
+
+# Start/stop cues are short tones synthesized once into in-memory WAV files, so playing
+# one never touches the disk or the decoder again.
+SAMPLE_RATE = 22050
+CUE_TONES = {
+    # name: (frequency Hz, duration s)
+    "start": (880, 0.08),
+    "stop": (440, 0.12),
+}
+VOLUME = 0.3
+
+def make_tone_wav(frequency, duration, volume=VOLUME, sample_rate=SAMPLE_RATE):
+    """ A mono 16-bit sine tone as WAV bytes, faded in and out to avoid clicks. """
+    n = int(sample_rate * duration); fade = max(1, n // 10)
+    samples = array("h", bytes(2 * n))
+    for i in range(n):
+        envelope = min(1.0, i / fade, (n - i) / fade)
+        samples[i] = int(32767 * volume * envelope * math.sin(2 * math.pi * frequency * i / sample_rate))
+    if sys.byteorder == "big": samples.byteswap()
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(sample_rate); w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+# --- AUDIO SINKS ---
+class AudioSink:
+    """ Where cues end up. load() prepares a WAV once, play() plays a loaded cue and may block. """
+    name = None
+    def load(self, cue, wav): return wav
+    def play(self, sound): raise NotImplementedError
+    def close(self): pass
+
+class NullSink(AudioSink):
+    """ Plays nothing and counts what it was asked to play, for headless machines and tests. """
+    name = "null"
+
+    def __init__(self):
+        self.played = {}
+
+    def load(self, cue, wav): return cue
+    def play(self, sound): self.played[sound] = self.played.get(sound, 0) + 1
+
+class WinsoundSink(AudioSink):
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self.play_sound = winsound.PlaySound
+        self.flags = winsound.SND_MEMORY | winsound.SND_NODEFAULT
+
+    def play(self, sound): self.play_sound(sound, self.flags)
+
+class CommandSink(AudioSink):
+    """ Pipes each cue to a command-line player (PipeWire, PulseAudio or ALSA) on Linux. """
+    name = "command"
+    PLAYERS = (("pw-play", "-"), ("paplay",), ("aplay", "-q"))
+
+    def __init__(self):
+        for player in self.PLAYERS:
+            path = shutil.which(player[0])
+            if path:
+                self.command = [path, *player[1:]]; break
+        else:
+            raise ValueError("No audio player found (pw-play, paplay or aplay)")
+
+    def play(self, sound):
+        subprocess.run(self.command, input=sound, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+
+AUDIO_SINKS = {cls.name: cls for cls in (NullSink, WinsoundSink, CommandSink)}
+
+def create_audio_sink(name=None):
+    """ The named sink, or the best one available here with the null sink as the last resort. """
+    if name is not None: return AUDIO_SINKS[name]()
+    candidates = (WinsoundSink,) if sys.platform == "win32" else (CommandSink,)
+    for cls in candidates:
+        try:
+            return cls()
+        except (ImportError, ValueError):
+            pass
+    return NullSink()
+
+# --- AUDIO WORKER ---
+class AudioWorker:
+    """ One long-lived thread that plays cues through a sink.
+
+    play() only puts the cue name on a queue, so it never blocks the caller. Cues that
+    pile up while one is playing are collapsed into the most recent one, so toggling
+    quickly plays the final state rather than a backlog of beeps.
+    """
+    def __init__(self, sink=None):
+        self.sink = sink or create_audio_sink()
+        self.sounds = {cue: self.sink.load(cue, make_tone_wav(freq, duration)) for cue, (freq, duration) in CUE_TONES.items()}
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name="AudioWorker", daemon=True)
+        self.thread.start()
+
+    def play(self, cue):
+        self.queue.put(cue)
+
+    def run(self):
+        while True:
+            cue = self.queue.get()
+            while not self.queue.empty(): cue = self.queue.get()
+            if cue is None: break
+            try:
+                self.sink.play(self.sounds[cue])
+            except Exception as e:
+                print(f"Could not play the {cue} sound: {e}")
+
+    def close(self):
+        self.queue.put(None); self.thread.join(1); self.sink.close()
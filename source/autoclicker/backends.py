@@ -0,0 +1,355 @@
+import os
+import struct
+import sys
+import time
+from array import array
+
+# Buttons are passed around by name so the engine never needs pynput types.
+BUTTONS = ("left", "right", "middle")
+
+# Event kinds stored by RecordingBackend and by recorded macros
+EVENT_MOVE, EVENT_PRESS, EVENT_RELEASE, EVENT_CLICK, EVENT_SCROLL, EVENT_KEY_DOWN, EVENT_KEY_UP = range(7)
+
+# --- INPUT BACKENDS ---
+class InputBackend:
+    """ Interface for everything that produces mouse input.
+
+    A backend is resolved once when a run starts, so implementations should do their
+    imports and lookups in __init__ and keep the per-call methods as thin as possible.
+    Backends may queue input instead of sending it; the engine calls flush() once after
+    running every event that was due at the same moment.
+    """
+    name = None
+    # Approach moves before a click are planned as this many points spread over move_duration seconds.
+    move_steps = 10
+    move_duration = 0.02
+    # Seconds a clicker keeps the button down. 0 clicks with click(); otherwise the engine
+    # presses, and releases in a slot of its own, so nothing sleeps on the engine thread.
+    click_hold = 0
+
+    keyboard_controller = None
+    # A CursorCache fed by a mouse listener, when the app runs one
+    cursor = None
+
+    def press(self, button): raise NotImplementedError
+    def release(self, button): raise NotImplementedError
+    def move(self, x, y): raise NotImplementedError
+    def position(self): raise NotImplementedError
+    def scroll(self, dx, dy): raise NotImplementedError
+
+    def click(self, button):
+        self.press(button); self.release(button)
+
+    def flush(self):
+        pass
+
+    def cursor_position(self):
+        """ Where the cursor is: from the listener-fed cache when one is attached and live, else asked from the backend. """
+        cursor = self.cursor
+        if cursor is not None and cursor.live: return cursor.position()
+        return self.position()
+
+    # Keys are passed as stored in profiles ("f6", "a"). Unless a backend has its own
+    # keyboard path they go through pynput, which every platform supports.
+    def key_down(self, key):
+        self.pynput_keyboard().press(self.keyboard_keys(key))
+
+    def key_up(self, key):
+        self.pynput_keyboard().release(self.keyboard_keys(key))
+
+    def pynput_keyboard(self):
+        if self.keyboard_controller is None:
+            from pynput import keyboard
+            self.keyboard_controller = keyboard.Controller()
+        return self.keyboard_controller
+
+    def keyboard_keys(self, key):
+        from autoclicker.keys import str_to_key
+        return str_to_key(key)
+
+    def close(self):
+        pass
+
+class PynputBackend(InputBackend):
+    name = "pynput"
+
+    def __init__(self, controller=None):
+        from pynput import mouse
+        self.controller = controller or mouse.Controller()
+        self.buttons = {name: mouse.Button[name] for name in BUTTONS}
+
+    def press(self, button): self.controller.press(self.buttons[button])
+    def release(self, button): self.controller.release(self.buttons[button])
+    def click(self, button): self.controller.click(self.buttons[button])
+    def move(self, x, y): self.controller.position = (int(x), int(y))
+    def position(self): return self.controller.position
+    def scroll(self, dx, dy): self.controller.scroll(dx, dy)
+
+class Win32Backend(InputBackend):
+    name = "win32"
+    move_steps = 15
+    move_duration = 0.03
+    # Some games ignore a down/up pair with no gap in between.
+    click_hold = 0.01
+
+    def __init__(self):
+        import win32api, win32con
+        self.mouse_event = win32api.mouse_event
+        self.get_cursor_pos = win32api.GetCursorPos
+        self.move_flag = win32con.MOUSEEVENTF_MOVE
+        self.wheel_flag = win32con.MOUSEEVENTF_WHEEL
+        self.hwheel_flag = win32con.MOUSEEVENTF_HWHEEL
+        self.wheel_delta = win32con.WHEEL_DELTA
+        self.down_flags = {"left": win32con.MOUSEEVENTF_LEFTDOWN, "right": win32con.MOUSEEVENTF_RIGHTDOWN, "middle": win32con.MOUSEEVENTF_MIDDLEDOWN}
+        self.up_flags = {"left": win32con.MOUSEEVENTF_LEFTUP, "right": win32con.MOUSEEVENTF_RIGHTUP, "middle": win32con.MOUSEEVENTF_MIDDLEUP}
+
+    def press(self, button): self.mouse_event(self.down_flags[button], 0, 0, 0, 0)
+    def release(self, button): self.mouse_event(self.up_flags[button], 0, 0, 0, 0)
+
+    def move(self, x, y):
+        # Relative moves reach games that read raw input and ignore SetCursorPos.
+        cur_x, cur_y = self.get_cursor_pos()
+        self.mouse_event(self.move_flag, int(x) - cur_x, int(y) - cur_y, 0, 0)
+
+    def position(self): return self.get_cursor_pos()
+
+    def scroll(self, dx, dy):
+        if dy: self.mouse_event(self.wheel_flag, 0, 0, int(dy * self.wheel_delta), 0)
+        if dx: self.mouse_event(self.hwheel_flag, 0, 0, int(dx * self.wheel_delta), 0)
+
+# --- LINUX BACKENDS ---
+def x11_screen_size(display_name=None):
+    """ (width, height) of the default X screen. Raises ImportError without python-xlib, ValueError without a display. """
+    from Xlib import display, error
+    try:
+        connection = display.Display(display_name)
+    except error.DisplayError as e:
+        raise ValueError(f"Cannot open the X display: {e}")
+    try:
+        screen = connection.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+    finally:
+        connection.close()
+
+class XTestBackend(InputBackend):
+    """ X11 input through the XTEST extension, batched per engine tick.
+
+    press/release/move/scroll only append a request to Xlib's output buffer; flush() sends
+    everything queued since the last one in a single write. XTEST requests have no reply,
+    so a click costs no round trip at all, where pynput's costs several.
+    """
+    name = "xtest"
+    # X core buttons, wheel steps are presses of 4-7
+    BUTTON_CODES = {"left": 1, "middle": 2, "right": 3}
+    WHEEL_BUTTONS = ((4, 5), (6, 7)) # (up, down), (left, right)
+
+    def __init__(self, display_name=None):
+        from Xlib import X, display, error
+        try:
+            self.display = display.Display(display_name)
+        except error.DisplayError as e:
+            raise ValueError(f"Cannot open the X display: {e}")
+        if not self.display.has_extension("XTEST"):
+            self.display.close(); raise ValueError("The X server has no XTEST extension")
+        self.fake_input = self.display.xtest_fake_input
+        self.root = self.display.screen().root
+        self.button_press, self.button_release, self.motion = X.ButtonPress, X.ButtonRelease, X.MotionNotify
+
+    def press(self, button): self.fake_input(self.button_press, self.BUTTON_CODES[button])
+    def release(self, button): self.fake_input(self.button_release, self.BUTTON_CODES[button])
+
+    def click(self, button):
+        code = self.BUTTON_CODES[button]
+        self.fake_input(self.button_press, code); self.fake_input(self.button_release, code)
+
+    def move(self, x, y): self.fake_input(self.motion, x=int(x), y=int(y))
+
+    def position(self):
+        pointer = self.root.query_pointer() # A round trip; flushes whatever is queued first
+        return pointer.root_x, pointer.root_y
+
+    def scroll(self, dx, dy):
+        for steps, (back, forward) in ((-dy, self.WHEEL_BUTTONS[0]), (dx, self.WHEEL_BUTTONS[1])):
+            code = forward if steps > 0 else back
+            for _ in range(abs(int(steps))):
+                self.fake_input(self.button_press, code); self.fake_input(self.button_release, code)
+
+    def flush(self): self.display.flush()
+    def close(self): self.display.close()
+
+class UinputBackend(InputBackend):
+    """ A virtual absolute pointer on /dev/uinput, so it also works on Wayland and in games that read evdev.
+
+    Events are packed into one buffer and flush() hands them to the kernel in a single
+    write(), however many clicks and moves were due in the tick. Each press, release and
+    move is its own SYN_REPORT frame, as from a real mouse. The device cannot read the
+    cursor, so position() asks X11 when there is one and otherwise returns where this
+    device last moved it. Needs write access to /dev/uinput (e.g. the input group).
+    """
+    name = "uinput"
+    # Compositors need a moment to open a new device; input sent before that is lost
+    settle_time = 0.2
+    # struct input_event: timeval, type, code, value. The kernel stamps the time itself.
+    EVENT = struct.Struct("llHHi")
+
+    def __init__(self, screen_size=None):
+        from evdev import AbsInfo, UInput, ecodes
+        from evdev.uinput import UInputError
+        # One X connection for the screen size and position(), closed in close()
+        self.x_display = self.query_pointer = None
+        try:
+            from Xlib import display
+            self.x_display = display.Display(); self.query_pointer = self.x_display.screen().root.query_pointer
+        except Exception:
+            pass
+        try:
+            if screen_size is None and self.x_display is not None:
+                screen = self.x_display.screen(); screen_size = (screen.width_in_pixels, screen.height_in_pixels)
+            if screen_size is None:
+                try:
+                    screen_size = x11_screen_size()
+                except (ImportError, ValueError) as e:
+                    raise ValueError(f"The uinput backend needs the screen size: {e}")
+            width, height = screen_size
+            e = ecodes
+            capabilities = {
+                e.EV_KEY: [e.BTN_LEFT, e.BTN_RIGHT, e.BTN_MIDDLE],
+                e.EV_ABS: [(e.ABS_X, AbsInfo(0, 0, width - 1, 0, 0, 0)), (e.ABS_Y, AbsInfo(0, 0, height - 1, 0, 0, 0))],
+                e.EV_REL: [e.REL_WHEEL, e.REL_HWHEEL],
+            }
+            try:
+                self.device = UInput(capabilities, name="autoclicker")
+            except (OSError, UInputError) as err:
+                raise ValueError(f"Cannot create a uinput device: {err}")
+        except BaseException:
+            if self.x_display is not None: self.x_display.close()
+            raise
+        self.fd = self.device.fd
+        self.pack = self.EVENT.pack
+        self.codes = e
+        self.syn = self.pack(0, 0, e.EV_SYN, e.SYN_REPORT, 0)
+        # Button frames are packed once up front
+        buttons = {"left": e.BTN_LEFT, "right": e.BTN_RIGHT, "middle": e.BTN_MIDDLE}
+        self.down = {name: self.pack(0, 0, e.EV_KEY, code, 1) + self.syn for name, code in buttons.items()}
+        self.up = {name: self.pack(0, 0, e.EV_KEY, code, 0) + self.syn for name, code in buttons.items()}
+        self.pending = []
+        self.max_x, self.max_y = width - 1, height - 1
+        self.x, self.y = width // 2, height // 2
+        time.sleep(self.settle_time)
+
+    def press(self, button): self.pending.append(self.down[button])
+    def release(self, button): self.pending.append(self.up[button])
+
+    def click(self, button):
+        self.pending.append(self.down[button]); self.pending.append(self.up[button])
+
+    def move(self, x, y):
+        e = self.codes
+        self.x, self.y = min(max(int(x), 0), self.max_x), min(max(int(y), 0), self.max_y)
+        self.pending.append(self.pack(0, 0, e.EV_ABS, e.ABS_X, self.x) + self.pack(0, 0, e.EV_ABS, e.ABS_Y, self.y) + self.syn)
+
+    def position(self):
+        if self.query_pointer is None: return (self.x, self.y)
+        pointer = self.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def scroll(self, dx, dy):
+        e = self.codes
+        if dy: self.pending.append(self.pack(0, 0, e.EV_REL, e.REL_WHEEL, int(dy)))
+        if dx: self.pending.append(self.pack(0, 0, e.EV_REL, e.REL_HWHEEL, int(dx)))
+        self.pending.append(self.syn)
+
+    def flush(self):
+        if not self.pending: return
+        pending, self.pending = self.pending, [] # Swapped, so a stop on another thread cannot lose an event
+        data = b"".join(pending)
+        while data: data = data[os.write(self.fd, data):]
+
+    def close(self):
+        self.flush(); self.device.close()
+        if self.x_display is not None: self.x_display.close(); self.x_display = self.query_pointer = None
+
+class RecordingBackend(InputBackend):
+    """ Stores timestamped events in preallocated parallel arrays instead of producing input.
+
+    Nothing is allocated per event, so it can stand in for a real backend when measuring
+    throughput and timing on a headless machine. Events past capacity are counted in
+    `dropped` rather than growing the arrays.
+    """
+    name = "recording"
+
+    def __init__(self, capacity=1 << 20, start_pos=(0, 0)):
+        self.capacity = capacity
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.kinds = array("b", bytes(capacity))
+        self.xs = array("i", bytes(4 * capacity))
+        self.ys = array("i", bytes(4 * capacity))
+        self.codes = array("i", bytes(4 * capacity))
+        self.count = 0
+        self.dropped = 0
+        self.x, self.y = start_pos
+        self.button_codes = {name: i for i, name in enumerate(BUTTONS)}
+        # Keys are recorded as indexes into this table
+        self.keys = []
+        self.key_codes = {}
+
+    def record(self, kind, code=-1):
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1; return
+        self.timestamps[i] = time.perf_counter_ns()
+        self.kinds[i] = kind; self.xs[i] = self.x; self.ys[i] = self.y; self.codes[i] = code
+        self.count = i + 1
+
+    def press(self, button): self.record(EVENT_PRESS, self.button_codes[button])
+    def release(self, button): self.record(EVENT_RELEASE, self.button_codes[button])
+    def click(self, button): self.record(EVENT_CLICK, self.button_codes[button])
+
+    def move(self, x, y):
+        self.x, self.y = int(x), int(y)
+        self.record(EVENT_MOVE)
+
+    def position(self): return (self.x, self.y)
+    def scroll(self, dx, dy): self.record(EVENT_SCROLL, int(dy))
+    def key_down(self, key): self.record(EVENT_KEY_DOWN, self.key_code(key))
+    def key_up(self, key): self.record(EVENT_KEY_UP, self.key_code(key))
+
+    def key_code(self, key):
+        code = self.key_codes.get(key)
+        if code is None:
+            code = self.key_codes[key] = len(self.keys); self.keys.append(key)
+        return code
+
+    def clear(self):
+        self.count = 0; self.dropped = 0
+
+    def events(self, kind=None):
+        """ Yield (timestamp_ns, kind, x, y, detail) for every recorded event, optionally of one kind.
+
+        detail is the button name for mouse buttons, the key for key events, the wheel steps
+        for scrolls and None for moves.
+        """
+        for i in range(self.count):
+            if kind is None or self.kinds[i] == kind:
+                code = self.codes[i]; event_kind = self.kinds[i]
+                if event_kind in (EVENT_PRESS, EVENT_RELEASE, EVENT_CLICK): detail = BUTTONS[code]
+                elif event_kind in (EVENT_KEY_DOWN, EVENT_KEY_UP): detail = self.keys[code]
+                elif event_kind == EVENT_SCROLL: detail = code
+                else: detail = None
+                yield self.timestamps[i], event_kind, self.xs[i], self.ys[i], detail
+
+    def click_times(self):
+        """ Timestamps of every click, counting a press as the moment of a press/release pair. """
+        return [self.timestamps[i] for i in range(self.count) if self.kinds[i] in (EVENT_CLICK, EVENT_PRESS)]
+
+BACKENDS = {cls.name: cls for cls in (PynputBackend, Win32Backend, XTestBackend, UinputBackend, RecordingBackend)}
+LINUX_BACKENDS = ("pynput", "xtest", "uinput")
+
+def create_backend(name, **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown input backend: {name!r}")
+    if name == "win32" and sys.platform != "win32":
+        raise ValueError("The win32 input backend is only available on Windows")
+    if name in ("xtest", "uinput") and not sys.platform.startswith("linux"):
+        raise ValueError(f"The {name} input backend is only available on Linux")
+    return BACKENDS[name](**kwargs)
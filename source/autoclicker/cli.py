@@ -0,0 +1,270 @@
+import argparse
+import datetime
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from functools import partial
+
+from autoclicker.backends import BACKENDS, LINUX_BACKENDS, create_backend
+from autoclicker.config import ClickerConfig
+from autoclicker.cursor import CursorCache
+from autoclicker.engine import ClickEngine
+from autoclicker.hotkeys import TriggerMap, chord_label, normalize_chord
+from autoclicker.profiler import ThreadSampler, default_profile_path
+from autoclicker.profiles import INDEX_FILE, LEGACY_PROFILE_FILE, PROFILE_DIR, ProfileStore
+from autoclicker.sampling import load_numpy
+from autoclicker.scheduler import parse_clock_time, perf_ns_at
+from autoclicker.tracing import default_trace_path
+from autoclicker.watcher import CAPTURE_BACKENDS, RegionWatcher, create_capture, parse_regions
+
+# Nothing in here may import PyQt6 or winsound; the runner has to work on machines
+# without a display server toolkit and start well under 100 ms.
+
+CLICKERS = (("left", "Left Clicker"), ("right", "Right Clicker"))
+
+def open_profiles(path):
+    """ Profiles from a profile directory, or from a single legacy profiles.json file.
+
+    Nothing here writes: a legacy profiles.json the GUI has not imported into a profile
+    directory yet is read as it is, and the import is left to the GUI.
+    """
+    if os.path.isfile(path):
+        with open(path, 'r') as f: return json.load(f)
+    if not os.path.exists(os.path.join(path, INDEX_FILE)) and os.path.isfile(LEGACY_PROFILE_FILE):
+        with open(LEGACY_PROFILE_FILE, 'r') as f: return json.load(f)
+    return ProfileStore(path, legacy_file=None, debounce=0)
+
+def default_backend_name(prefs):
+    """ The input backend a profile's preferences pick on this platform. """
+    if prefs.get("use_win32_input") and sys.platform == "win32": return "win32"
+    if sys.platform.startswith("linux") and prefs.get("linux_input") in LINUX_BACKENDS: return prefs["linux_input"]
+    return "pynput"
+
+# --- HEADLESS CLICKERS ---
+class HeadlessClicker:
+    def __init__(self, title, config, trigger_key, engine, backend, watch_regions=()):
+        self.title = title
+        self.config = config
+        self.trigger_key = trigger_key
+        self.watch_regions = watch_regions
+        self.engine = engine
+        self.backend = backend
+
+    @property
+    def clicking(self):
+        return self.engine.is_running(self)
+
+    def start_clicking(self, start_ns=None):
+        if self.clicking: return
+        self.engine.start_clicker(self, self.config, self.backend, self.on_run_finished, start_ns)
+        print(f"{self.title} ON")
+
+    def stop_clicking(self):
+        if not self.clicking: return
+        stats = self.engine.snapshot(self)
+        self.engine.stop_job(self)
+        print(f"{self.title} OFF")
+        if stats and stats["clicks"] > 1:
+            print(f"  {stats['clicks']} clicks, {stats['cps']:.1f} CPS, jitter p95 {stats['jitter_p95_ms']:.2f} ms, missed {stats['missed']}")
+
+    def on_run_finished(self):
+        print(f"{self.title} finished")
+
+    def handle_key_press(self):
+        if self.config.activation_mode == "Toggle":
+            if self.clicking: self.stop_clicking()
+            else: self.start_clicking()
+        elif self.config.activation_mode == "Press":
+            self.start_clicking()
+
+    def handle_key_release(self):
+        if self.config.activation_mode == "Press":
+            self.stop_clicking()
+
+class HeadlessRunner:
+    """ Drives the enabled clickers of one profile from its trigger keys, without a window. """
+    def __init__(self, profile, backend, stats_interval=0, start_at=None, trace_path=None, sample_path=None):
+        self.stats_interval = stats_interval
+        # Where to write a Chrome trace of the whole run on exit, or None
+        self.trace_path = trace_path
+        # Where to write the thread profile, or None for a fresh file under cpu-profiles/ each time
+        self.sample_path = sample_path
+        self.sampler = ThreadSampler()
+        # Wall-clock time (epoch seconds) to start every clicker at, in phase, or None to wait for the triggers
+        self.start_at = start_at
+        prefs = profile.get("prefs", {})
+        self.backend = backend; backend_name = backend.name
+        self.cursor = CursorCache()
+        self.engine = ClickEngine()
+        self.clickers = []
+        self.triggers = TriggerMap()
+        for button, title in CLICKERS:
+            settings = profile.get(button)
+            if not settings or not settings.get("enabled"): continue
+            trigger_key = normalize_chord(settings.get("trigger_key"))
+            watch_regions = parse_regions(settings.get("watch_regions", [])) if settings.get("watch_enabled") else ()
+            if trigger_key is None and not watch_regions:
+                print(f"{title} has no trigger key or watched region set, skipping it."); continue
+            config = ClickerConfig.from_settings(settings, button, backend_name)
+            self.clickers.append(HeadlessClicker(title, config, trigger_key, self.engine, backend, watch_regions))
+        # The hook only queues the handler; a dispatch thread runs it outside the OS hook
+        self.events = queue.SimpleQueue()
+        put = self.events.put
+        self.triggers.rebuild((clicker.trigger_key, partial(put, clicker.handle_key_press), partial(put, clicker.handle_key_release)) for clicker in self.clickers)
+        # A watched region matching acts like the clicker's trigger being pressed, and released when it stops
+        self.watcher = None
+        self.watch_fps = prefs.get("watch_fps", 20)
+
+    def build_watcher(self, capture_name=None):
+        """ Set up watching for the clickers' regions, if any. Raises ImportError without a capture library. """
+        regions = [(clicker, region) for clicker in self.clickers for region in clicker.watch_regions]
+        if regions:
+            self.watcher = RegionWatcher(create_capture(capture_name), self.on_region_changed, self.watch_fps)
+            self.watcher.set_regions(regions)
+
+    def on_press(self, key):
+        self.triggers.press(key)
+
+    def on_release(self, key):
+        self.triggers.release(key)
+
+    def on_region_changed(self, clicker, matched):
+        self.events.put(clicker.handle_key_press if matched else clicker.handle_key_release)
+
+    def dispatch_events(self):
+        while True:
+            self.events.get()()
+
+    def run(self):
+        from pynput import keyboard
+        threading.Thread(target=self.dispatch_events, name="TriggerDispatch", daemon=True).start()
+        listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release); listener.daemon = True; listener.name = "KeyboardListener"; listener.start()
+        # Clicks read the cursor from a listener-fed cache instead of asking the display server each time
+        self.cursor.start(); self.backend.cursor = self.cursor
+        # Pay for the NumPy import now rather than on the first trigger press.
+        threading.Thread(target=load_numpy, daemon=True).start()
+        for clicker in self.clickers:
+            watched = f", {len(clicker.watch_regions)} watched region(s)" if clicker.watch_regions else ""
+            print(f"{clicker.title}: {chord_label(clicker.trigger_key)} ({clicker.config.activation_mode}{watched})")
+        if self.watcher: self.watcher.start()
+        print("Listening for trigger keys. Press Ctrl+C to quit.")
+        if self.trace_path: self.engine.start_trace()
+        if self.sample_path is not None: self.toggle_sampler()
+        # kill -USR1 <pid> starts and stops the thread profiler without stopping the clickers
+        if hasattr(signal, "SIGUSR1"): signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle_sampler())
+        if self.start_at is not None:
+            start_ns = perf_ns_at(self.start_at)
+            print(f"All clickers start at {datetime.datetime.fromtimestamp(self.start_at).strftime('%H:%M:%S.%f')[:-3]}.")
+            for clicker in self.clickers: clicker.start_clicking(start_ns)
+        next_stats = time.monotonic() + self.stats_interval
+        try:
+            while listener.is_alive():
+                listener.join(min(0.5, self.stats_interval) if self.stats_interval > 0 else 0.5)
+                if self.stats_interval > 0 and time.monotonic() >= next_stats:
+                    self.print_stats(); next_stats += self.stats_interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.watcher: self.watcher.stop()
+            self.engine.stop_all(); listener.stop(); self.cursor.stop()
+            if self.trace_path: self.save_trace()
+            if self.sampler.running: self.toggle_sampler()
+
+    def toggle_sampler(self):
+        if not self.sampler.running:
+            self.sampler.start(); print("Profiling all threads.", flush=True); return
+        sampler = self.sampler.stop()
+        try:
+            path = sampler.write(self.sample_path or default_profile_path())
+        except OSError as e:
+            print(f"Could not write the thread profile: {e}", file=sys.stderr); return
+        print(f"Wrote {sampler.samples} samples of every thread to {path}; render it with flamegraph.pl or speedscope", flush=True)
+
+    def save_trace(self):
+        tracer = self.engine.stop_trace()
+        try:
+            tracer.write_chrome_trace(self.trace_path)
+        except OSError as e:
+            print(f"Could not write the trace: {e}", file=sys.stderr); return
+        print(f"Wrote {min(tracer.count, tracer.capacity)} timeline records to {self.trace_path}; open it in ui.perfetto.dev")
+
+    def print_stats(self):
+        # One JSON object per line and running clicker, for scripts to consume
+        for clicker in self.clickers:
+            stats = self.engine.snapshot(clicker)
+            if stats: print(json.dumps(dict(stats, clicker=clicker.config.button)), flush=True)
+        print(json.dumps(dict(self.triggers.timings.snapshot(), hook="keyboard")), flush=True)
+        if self.watcher: print(json.dumps(dict(self.watcher.snapshot(), watcher="regions")), flush=True)
+
+# --- COMMANDS ---
+def cmd_run(args):
+    try:
+        profiles = open_profiles(args.profiles)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Could not read {args.profiles}: {e}", file=sys.stderr); return 1
+    profile = profiles.get(args.profile)
+    if profile is None:
+        print(f"No profile named '{args.profile}' in {args.profiles}.", file=sys.stderr); return 1
+    try:
+        start_at = parse_clock_time(args.start_at) if args.start_at else (time.time() + args.start_in if args.start_in is not None else None)
+    except ValueError as e:
+        print(e, file=sys.stderr); return 2
+    backend_name = args.backend or default_backend_name(profile.get("prefs", {}))
+    try:
+        backend = create_backend(backend_name)
+    except (ImportError, ValueError) as e:
+        print(f"Cannot use the {backend_name} input backend: {e}", file=sys.stderr); return 1
+    try:
+        trace_path = (args.trace or default_trace_path()) if args.trace is not None else None
+        runner = HeadlessRunner(profile, backend, args.stats, start_at, trace_path, args.profile_threads)
+    except ValueError as e:
+        print(f"Invalid profile '{args.profile}': {e}", file=sys.stderr); return 2
+    try:
+        runner.build_watcher(args.capture)
+    except ImportError as e:
+        print(f"Cannot watch screen regions: {e}", file=sys.stderr); return 1
+    if not runner.clickers:
+        print(f"Profile '{args.profile}' has no enabled clicker with a trigger key or watched region.", file=sys.stderr); return 1
+    try:
+        runner.run()
+    except ImportError as e:
+        # The trigger keys and the cursor are read through pynput whatever the input backend
+        print(f"Cannot listen for trigger keys: {e}", file=sys.stderr); return 1
+    return 0
+
+def cmd_list(args):
+    try:
+        profiles = open_profiles(args.profiles)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Could not read {args.profiles}: {e}", file=sys.stderr); return 1
+    for name in (profiles.names() if isinstance(profiles, ProfileStore) else profiles): print(name)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="autoclicker", description="Run autoclicker profiles without the GUI.")
+    parser.add_argument("--profiles", default=PROFILE_DIR, help="profile directory, or a legacy profiles.json file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="listen for the trigger keys of a profile and click")
+    run.add_argument("--profile", required=True, help="name of the profile to run")
+    run.add_argument("--backend", choices=sorted(BACKENDS), help="input backend (default: from the profile's preferences)")
+    run.add_argument("--capture", choices=sorted(name for name in CAPTURE_BACKENDS if name != "synthetic"), help="screen capture backend for watched regions (default: the first available)")
+    run.add_argument("--stats", type=float, default=0, metavar="SECONDS", help="print the timing statistics of running clickers as JSON lines this often")
+    run.add_argument("--trace", nargs="?", const="", metavar="FILE", help="record the click timeline and write it as a Chrome trace (Perfetto) on exit, to FILE or traces/")
+    run.add_argument("--profile-threads", nargs="?", const="", metavar="FILE", help="sample the stacks of every thread from the start and write them as folded stacks for flame graphs on exit, to FILE or cpu-profiles/; SIGUSR1 toggles this at any time")
+    start = run.add_mutually_exclusive_group()
+    start.add_argument("--start-at", metavar="HH:MM:SS.mmm", help="start every enabled clicker together at this local time instead of waiting for a trigger")
+    start.add_argument("--start-in", type=float, metavar="SECONDS", help="start every enabled clicker together after this many seconds")
+    run.set_defaults(func=cmd_run)
+
+    list_cmd = commands.add_parser("list", help="list the profiles in profiles.json")
+    list_cmd.set_defaults(func=cmd_list)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
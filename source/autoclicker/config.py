@@ -0,0 +1,86 @@
+from autoclicker.backends import BUTTONS
+from autoclicker.movement import MOVE_MODES
+from autoclicker.scheduler import MISSED_POLICIES
+from autoclicker.sequence import parse_points
+
+ACTIVATION_MODES = ("Toggle", "Press")
+
+# Per-clicker settings as stored in profiles.json
+DEFAULT_CLICKER_SETTINGS = {
+    "enabled": False, "trigger_key": None, "is_random": False,
+    "interval": "0.1", "min_interval": "0.1", "max_interval": "0.5",
+    "num_clicks": "0", "activation_mode": "Toggle",
+    "randomize_pos": False, "randomize_radius": 5,
+    "missed_policy": "Catch Up", "random_seed": "", "move_mode": "Linear",
+    "sequence_enabled": False, "sequence": [], "optimize_order": False,
+    "watch_enabled": False, "watch_regions": []
+}
+
+# App-wide preferences as stored in the "prefs" entry of a profile
+DEFAULT_PREFS = {
+    "show_notification": True, "sounds_enabled": True, "countdown_enabled": False,
+    "countdown_seconds": 3, "ask_on_close": True, "use_win32_input": False, "linux_input": "pynput",
+    "overlay_fps": 10, "watch_fps": 20
+}
+
+class ClickerConfig:
+    """ Validated, immutable snapshot of one clicker's settings.
+
+    Built once on the thread that owns the settings (the GUI thread in the app) and read
+    by the engine without locking. To change a running clicker, build a new config and
+    swap it in whole with ClickerRun.swap_config().
+    """
+    __slots__ = ("button", "backend", "num_clicks", "is_random", "interval_ns", "min_interval_ns",
+                 "max_interval_ns", "randomize_pos", "radius", "missed_policy", "activation_mode", "seed",
+                 "move_mode", "sequence", "optimize_order")
+
+    def __init__(self, button, backend="pynput", num_clicks=0, is_random=False, interval=0.1,
+                 min_interval=0.1, max_interval=0.5, randomize_pos=False, radius=5,
+                 missed_policy="Catch Up", activation_mode="Toggle", seed=None, move_mode="Linear",
+                 sequence=(), optimize_order=False):
+        if button not in BUTTONS: raise ValueError(f"Unknown mouse button: {button!r}")
+        if num_clicks < 0: raise ValueError("Clicks must be 0 (infinite) or more")
+        if min(interval, min_interval, max_interval) < 0: raise ValueError("Intervals cannot be negative")
+        if is_random and min_interval > max_interval: raise ValueError("Min interval is larger than max interval")
+        if not 1 <= radius <= 100: raise ValueError("Radius must be between 1 and 100 px")
+        if missed_policy not in MISSED_POLICIES: raise ValueError(f"Unknown missed click policy: {missed_policy!r}")
+        if activation_mode not in ACTIVATION_MODES: raise ValueError(f"Unknown activation mode: {activation_mode!r}")
+        if seed is not None and seed < 0: raise ValueError("Random seed cannot be negative")
+        if move_mode not in MOVE_MODES: raise ValueError(f"Unknown movement mode: {move_mode!r}")
+        # A non-empty sequence replaces clicking at the cursor with clicking these points in a loop
+        sequence = tuple(sequence)
+        values = {
+            "button": button, "backend": backend, "num_clicks": num_clicks, "is_random": is_random,
+            "interval_ns": int(interval * 1e9), "min_interval_ns": int(min_interval * 1e9),
+            "max_interval_ns": int(max_interval * 1e9), "randomize_pos": randomize_pos, "radius": radius,
+            "missed_policy": missed_policy, "activation_mode": activation_mode, "seed": seed,
+            "move_mode": move_mode, "sequence": sequence, "optimize_order": optimize_order
+        }
+        for name, value in values.items(): object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ClickerConfig is immutable; build a new one and swap it in")
+
+    def __delattr__(self, name):
+        raise AttributeError("ClickerConfig is immutable; build a new one and swap it in")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ClickerConfig({fields})"
+
+    @classmethod
+    def from_settings(cls, settings, button, backend="pynput"):
+        """ Build a config from a profiles.json clicker entry. Raises ValueError on bad input. """
+        s = dict(DEFAULT_CLICKER_SETTINGS, **settings)
+        seed = str(s["random_seed"] or "").strip()
+        sequence = parse_points(s["sequence"], button) if s["sequence_enabled"] else ()
+        if s["sequence_enabled"] and not sequence: raise ValueError("The click sequence has no points")
+        return cls(
+            button, backend,
+            num_clicks=int(s["num_clicks"]), is_random=bool(s["is_random"]),
+            interval=float(s["interval"]), min_interval=float(s["min_interval"]),
+            max_interval=float(s["max_interval"]), randomize_pos=bool(s["randomize_pos"]),
+            radius=int(s["randomize_radius"]), missed_policy=s["missed_policy"],
+            activation_mode=s["activation_mode"], seed=int(seed) if seed else None,
+            move_mode=s["move_mode"], sequence=sequence, optimize_order=bool(s["optimize_order"])
+        )
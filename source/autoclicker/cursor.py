@@ -0,0 +1,45 @@
+import time
+
+class CursorCache:
+    """ Last known cursor position, kept current by a pynput mouse listener.
+
+    The listener thread is the only writer: every reported move replaces one tuple
+    (x, y, seq, time_ns), so a reader on any thread gets a consistent position without
+    locking and without a round trip to the display server. seq counts updates; a
+    reader that kept the seq of its last read can tell whether the cursor has moved
+    since. Moves made by the clickers themselves are reported back by the listener too.
+    """
+    def __init__(self):
+        self.state = (0, 0, 0, 0)
+        self.listener = None
+
+    def update(self, x, y):
+        self.state = (int(x), int(y), self.state[2] + 1, time.perf_counter_ns())
+
+    def on_move(self, x, y):
+        self.update(x, y)
+
+    def read(self):
+        """ (x, y, seq, time_ns) of the last update. """
+        return self.state
+
+    def position(self):
+        x, y, _, _ = self.state
+        return x, y
+
+    @property
+    def live(self):
+        """ Whether the position can be trusted: it has been seeded and the listener is running. """
+        return self.state[2] > 0 and self.listener is not None and self.listener.is_alive()
+
+    def start(self):
+        """ Seed the cache from the current position and start listening. Raises ImportError without pynput. """
+        if self.listener is not None: return
+        from pynput import mouse
+        self.update(*mouse.Controller().position)
+        self.listener = mouse.Listener(on_move=self.on_move); self.listener.daemon = True; self.listener.name = "CursorListener"
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is None: return
+        self.listener.stop(); self.listener = None
@@ -0,0 +1,322 @@
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+from autoclicker.movement import plan_path
+from autoclicker.sampling import SampleStream
+from autoclicker.scheduler import DeadlineScheduler, SPIN_THRESHOLD_NS, wait_until
+from autoclicker.sequence import SequenceRun
+from autoclicker.telemetry import ClickTelemetry
+from autoclicker.tracing import ENGINE_TRACK, TRACE_CLICK, TRACE_FLUSH, TRACE_MOVE, TraceBuffer
+
+# Step value of heap entries that are click slots rather than movement steps
+SLOT = -1
+# Most events run between two flushes, so input is sent even when the engine never catches up
+MAX_BATCH = 64
+
+class ClickJob:
+    """ One active clicker in the engine's timer queue.
+
+    `task` drives the clicker:
+        tick()              performs one click and returns the delay to the next one in
+                            nanoseconds, or None when the run is complete.
+        move_lead(interval) how long before the next click (interval ns away, None for the
+                            first click) its approach movement should start, or None for no movement.
+        plan_move()         the precomputed list of (x, y) points to move through.
+        move(x, y)          moves the cursor to one point.
+        flush()             sends whatever input the backend queued; called once after every
+                            event that was due at the same moment has run.
+        cancel()            optional; called once after the job is stopped, e.g. to release
+                            a button that is held down.
+    Movement points are their own events in the timeline, spread evenly over the lead, so
+    moving never blocks clicks of this or any other clicker. `on_finished` is called from
+    the engine thread when the job ends on its own (not when it is stopped). The timing of
+    every click is recorded in `telemetry`.
+    """
+    __slots__ = ("key", "task", "scheduler", "on_finished", "active", "path", "move_end", "step_ns", "telemetry", "flush")
+
+    def __init__(self, key, task, scheduler, on_finished=None):
+        self.key = key
+        self.task = task
+        self.scheduler = scheduler
+        self.on_finished = on_finished
+        self.active = True
+        self.path = None
+        self.move_end = 0
+        self.step_ns = 0
+        self.telemetry = ClickTelemetry()
+        self.flush = task.flush
+
+    def snapshot(self):
+        return self.telemetry.snapshot(self.scheduler.missed)
+
+class ClickerRun:
+    """ Click loop for one clicker, driven entirely by an immutable ClickerConfig. """
+    def __init__(self, config, backend):
+        self.config = config
+        self.backend = backend
+        self.click = backend.click
+        self.move = backend.move
+        self.flush = backend.flush
+        self.move_duration_ns = int(backend.move_duration * 1e9)
+        self.hold_ns = int(backend.click_hold * 1e9)
+        # The button held down until the release slot, and the gap from that slot to the next press
+        self.pressed = None
+        self.rest_ns = None
+        self.clicks_done = 0
+        # A blank seed in the config gets a fresh one here; it is kept so the run can be replayed.
+        self.samples = SampleStream(config.seed)
+        self.seed = self.samples.seed
+        # One sample per click whatever the options, so click N always uses sample N of the seed.
+        self.sample = self.samples.next()
+
+    def swap_config(self, config):
+        # A single reference assignment, so tick() sees either the old or the new config, never a mix.
+        self.config = config
+
+    def tick(self):
+        if self.pressed is not None:
+            self.backend.release(self.pressed); self.pressed = None
+            return self.rest_ns
+        cfg = self.config
+        self.clicks_done += 1
+        if 0 < cfg.num_clicks <= self.clicks_done: interval = None
+        else:
+            u = self.sample[0]
+            self.sample = self.samples.next()
+            interval = cfg.min_interval_ns + int(u * (cfg.max_interval_ns - cfg.min_interval_ns)) if cfg.is_random else cfg.interval_ns
+        if not self.hold_ns:
+            self.click(cfg.button); return interval
+        # Held clicks release in a slot of their own, within half the interval so the rate holds
+        hold = self.hold_ns if interval is None else min(self.hold_ns, interval // 2)
+        self.backend.press(cfg.button); self.pressed = cfg.button
+        self.rest_ns = None if interval is None else interval - hold
+        return hold
+
+    def cancel(self):
+        # Stopped while the button is held down
+        if self.pressed is not None:
+            self.backend.release(self.pressed); self.pressed = None
+
+    def move_lead(self, interval_ns):
+        cfg = self.config
+        if not cfg.randomize_pos or self.pressed is not None: return None
+        if cfg.move_mode == "Teleport": return 0
+        # Squeeze the movement into half the interval rather than letting it delay the click.
+        return self.move_duration_ns if interval_ns is None else min(self.move_duration_ns, interval_ns // 2)
+
+    def plan_move(self):
+        cfg = self.config
+        if not cfg.randomize_pos: return None
+        _, dx, dy = self.sample
+        center_x, center_y = self.backend.cursor_position()
+        target = (center_x + dx * cfg.radius, center_y + dy * cfg.radius)
+        return plan_path((center_x, center_y), target, self.backend.move_steps, cfg.move_mode)
+
+class ClickEngine:
+    """ A single thread that dispatches every active clicker in deadline order.
+
+    Jobs live in a heap keyed on their next event, so adding clickers costs a heap push
+    rather than a thread, and the engine sleeps until the earliest event of all of them.
+
+    A job's `active` flag is its cancellation token. Stopping or replacing a job clears
+    it and wakes the engine at once, and waits while an event of that job is running
+    (up to its flush), so once stop_job() returns the job cannot reach its backend again.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.heap = []
+        self.jobs = {}
+        self.seq = itertools.count()
+        self.thread = None
+        # Jobs with an event in the batch the engine thread is running
+        self.running = set()
+        # A TraceBuffer while tracing, else None
+        self.tracer = None
+
+    def push(self, when, job, step):
+        # Caller holds self.cond
+        heapq.heappush(self.heap, (when, next(self.seq), job, step))
+
+    def start_job(self, key, task, policy="Catch Up", on_finished=None, start_ns=None):
+        """ Add a job whose first click is due at perf_counter_ns() value `start_ns`, or now.
+
+        Jobs given the same start_ns click in phase. Until then the job is an ordinary heap
+        entry, so stop_job() cancels a pending start immediately.
+        """
+        job = ClickJob(key, task, DeadlineScheduler(policy), on_finished)
+        lead = task.move_lead(None)
+        with self.cond:
+            old = self.jobs.get(key)
+            if old: self.retire(old)
+            self.jobs[key] = job
+            now = time.perf_counter_ns()
+            first = now + (lead or 0)
+            if start_ns is not None: first = max(first, start_ns)
+            job.move_end = job.scheduler.start(first)
+            # Movement is pushed first so it wins a tie with the click at the same instant.
+            if lead is not None: self.push(first - lead, job, 0)
+            self.push(job.move_end, job, SLOT)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="ClickEngine", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+        if old: self.cancel(old)
+        return job
+
+    def start_clicker(self, key, config, backend, on_finished=None, start_ns=None):
+        run = SequenceRun(config, backend) if config.sequence else ClickerRun(config, backend)
+        self.start_job(key, run, config.missed_policy, on_finished, start_ns)
+        return run
+
+    def retire(self, job):
+        """ Cancel a job and wait until none of its events is running. Caller holds self.cond. """
+        job.active = False
+        self.cond.notify_all()
+        if threading.current_thread() is self.thread: return # Stopped from one of its own events
+        while job in self.running: self.cond.wait()
+
+    def cancel(self, job):
+        cancel = getattr(job.task, "cancel", None)
+        if cancel is None: return
+        try:
+            cancel(); job.flush()
+        except Exception:
+            traceback.print_exc()
+
+    def stop_job(self, key):
+        with self.cond:
+            job = self.jobs.pop(key, None)
+            if job: self.retire(job)
+        if job: self.cancel(job)
+
+    def stop_all(self):
+        with self.cond:
+            jobs = list(self.jobs.values())
+            self.jobs.clear()
+            for job in jobs: self.retire(job)
+        for job in jobs: self.cancel(job)
+
+    def is_running(self, key):
+        return key in self.jobs
+
+    def snapshot(self, key):
+        """ Live timing statistics of a running job (see ClickTelemetry.snapshot), or None. """
+        job = self.jobs.get(key)
+        return job.snapshot() if job else None
+
+    def snapshots(self):
+        return {key: job.snapshot() for key, job in list(self.jobs.items())}
+
+    def next_due(self):
+        """ Wait under the lock until the earliest event is within spin range, then pop it. """
+        with self.cond:
+            while True:
+                while self.heap and not self.heap[0][2].active:
+                    heapq.heappop(self.heap)
+                if not self.heap:
+                    self.cond.wait(); continue
+                remaining = self.heap[0][0] - time.perf_counter_ns()
+                if remaining <= SPIN_THRESHOLD_NS:
+                    return heapq.heappop(self.heap)
+                self.cond.wait((remaining - SPIN_THRESHOLD_NS) / 1e9)
+
+    def claim(self, entry, horizon):
+        """ Mark the job of `entry` running if it is still active; otherwise, or when `entry` is None,
+        pop and claim the earliest event due by perf_counter_ns() value `horizon`. Returns None when there is none. """
+        with self.cond:
+            if entry is None or not entry[2].active:
+                heap = self.heap
+                while heap and not heap[0][2].active:
+                    heapq.heappop(heap)
+                entry = heapq.heappop(heap) if heap and heap[0][0] <= horizon else None
+            if entry is not None: self.running.add(entry[2])
+            return entry
+
+    def start_trace(self, capacity=None):
+        """ Start recording the engine timeline into a new TraceBuffer, which is returned. """
+        self.tracer = TraceBuffer(capacity) if capacity else TraceBuffer()
+        return self.tracer
+
+    def stop_trace(self):
+        """ Stop recording and return the TraceBuffer, or None if tracing was off. """
+        tracer, self.tracer = self.tracer, None
+        return tracer
+
+    def run(self):
+        flushes = set()
+        while True:
+            entry = self.next_due()
+            wait_until(entry[0])
+            tracer = self.tracer
+            if tracer is not None: wake = time.perf_counter_ns(); first = entry[0]
+            # Everything that was due when the engine woke runs back to back, up to MAX_BATCH events,
+            # then each backend sends its queued input once. Events that fall due meanwhile, like
+            # those of a 0 s interval, wait for the next batch, so an overloaded engine still flushes.
+            horizon = time.perf_counter_ns(); batch = 1
+            entry = self.claim(entry, horizon)
+            while entry is not None:
+                when, _, job, step = entry
+                if tracer is None:
+                    if step == SLOT: self.run_slot(job, when)
+                    else: self.run_move(job, when, step)
+                else:
+                    start = time.perf_counter_ns()
+                    if step == SLOT: self.run_slot(job, when)
+                    else: self.run_move(job, when, step)
+                    tracer.record(TRACE_CLICK if step == SLOT else TRACE_MOVE, tracer.track(job), step, when, wake, start, time.perf_counter_ns())
+                flushes.add(job.flush)
+                entry = self.claim(None, horizon) if batch < MAX_BATCH else None
+                batch += 1
+            for flush in flushes:
+                try:
+                    if tracer is None: flush()
+                    else:
+                        start = time.perf_counter_ns(); flush()
+                        tracer.record(TRACE_FLUSH, ENGINE_TRACK, 0, first, wake, start, time.perf_counter_ns())
+                except Exception:
+                    traceback.print_exc()
+            flushes.clear()
+            with self.cond:
+                self.running.clear(); self.cond.notify_all()
+
+    def run_slot(self, job, when):
+        # The release slot of a held click is not a click of its own
+        if not getattr(job.task, "pressed", None): job.telemetry.record(when, time.perf_counter_ns())
+        try:
+            delay = job.task.tick()
+            lead = job.task.move_lead(delay) if delay is not None else None
+        except Exception:
+            traceback.print_exc(); delay = None
+        if delay is None:
+            self.finish(job); return
+        with self.cond:
+            if not job.active: return
+            deadline = job.scheduler.advance(delay)
+            if lead is not None:
+                job.move_end = deadline
+                self.push(deadline - lead, job, 0)
+            self.push(deadline, job, SLOT)
+
+    def run_move(self, job, when, step):
+        try:
+            if step == 0:
+                job.path = job.task.plan_move()
+                if not job.path: return
+                job.step_ns = (job.move_end - when) // len(job.path)
+            x, y = job.path[step]
+            job.task.move(x, y)
+        except Exception:
+            traceback.print_exc(); return
+        if step + 1 < len(job.path):
+            with self.cond:
+                if job.active: self.push(when + job.step_ns, job, step + 1)
+
+    def finish(self, job):
+        with self.cond:
+            if not job.active: return
+            job.active = False
+            if self.jobs.get(job.key) is job: del self.jobs[job.key]
+        if job.on_finished: job.on_finished()
@@ -0,0 +1,144 @@
+# Trigger keys are stored as chords: modifiers and a key joined by "+", e.g. "ctrl+shift+f6".
+# A plain key ("f6", "a") is a chord without modifiers, so older profiles load unchanged.
+# Nothing here imports pynput; keys are only inspected through their attributes.
+import time
+
+from autoclicker.telemetry import DurationRing
+
+MODIFIER_ORDER = ("ctrl", "alt", "shift", "cmd")
+MODIFIER_BITS = {name: 1 << i for i, name in enumerate(MODIFIER_ORDER)}
+# pynput key name -> modifier bit, left and right variants folded together
+MODIFIER_KEYS = {
+    "ctrl": 1, "ctrl_l": 1, "ctrl_r": 1,
+    "alt": 2, "alt_l": 2, "alt_r": 2, "alt_gr": 2,
+    "shift": 4, "shift_l": 4, "shift_r": 4,
+    "cmd": 8, "cmd_l": 8, "cmd_r": 8,
+}
+# A second press of a held trigger within this long of the last one is OS auto-repeat
+REPEAT_WINDOW_NS = 1_000_000_000
+
+def key_id(key):
+    """ Normalized identity of a pynput key: the name of a special key or the lowercase character.
+
+    With Ctrl held some platforms report control characters instead of letters, so for
+    those the virtual key code is used when it maps to a letter or digit.
+    """
+    name = getattr(key, "name", None)
+    if name is not None: return name
+    char = getattr(key, "char", None)
+    if char is not None and char >= " ": return char.lower()
+    vk = getattr(key, "vk", None)
+    if vk is None: return None
+    return chr(vk).lower() if 0x30 <= vk <= 0x5A else f"<{vk}>"
+
+def parse_chord(chord):
+    """ Split a stored chord into (modifier mask, key id). Raises ValueError for unknown modifiers. """
+    # The key itself may be "+", so it is split off before the modifiers
+    if chord == "+" or chord.endswith("++"): mods, key = chord[:-2], "+"
+    else: mods, _, key = chord.rpartition("+")
+    if len(key) == 3 and key[0] == key[-1] == "'": key = key[1] # Older quoted characters
+    # key_id() reports characters in lowercase; older profiles kept "A" as typed with Shift or Caps Lock
+    if len(key) == 1: key = key.lower()
+    mask = 0
+    for mod in filter(None, mods.split("+")):
+        if mod not in MODIFIER_BITS: raise ValueError(f"Unknown modifier in trigger {chord!r}: {mod!r}")
+        mask |= MODIFIER_BITS[mod]
+    return mask, key
+
+def format_chord(mask, key):
+    return "+".join([name for name in MODIFIER_ORDER if mask & MODIFIER_BITS[name]] + [key])
+
+def normalize_chord(chord):
+    """ Canonical form of a stored trigger (modifiers in a fixed order), or None for no trigger. """
+    return format_chord(*parse_chord(chord)) if chord else None
+
+def chord_label(chord):
+    """ Short human-readable name of a trigger, as shown on the trigger buttons. """
+    if not chord: return "Not Set"
+    mask, key = parse_chord(chord)
+    return format_chord(mask, f"'{key}'" if len(key) == 1 else key)
+
+# --- DISPATCH ---
+class TriggerMap:
+    """ Precomputed map from (modifier mask, key id) to the actions bound to it.
+
+    Each action is a pair (on_press, on_release). rebuild() swaps in a new table with a
+    single assignment, so it can run on any thread while the hook keeps reading the old
+    one. A press costs one key_id() and one or two dict lookups whatever the number of
+    triggers: the exact chord first, then the bare key, so a plain "f6" trigger still
+    fires while a modifier happens to be held. A release calls the release actions of
+    whatever its press fired, even if the modifiers were let go first.
+
+    press() and release() run inside the OS keyboard hook, so actions should only hand
+    the event off (emit a queued signal, put it on a queue) and return. Auto-repeat
+    presses of a held trigger are dropped here, and the time spent in every call is
+    recorded in `timings`.
+    """
+    def __init__(self):
+        self.table = {}
+        self.mask = 0
+        self.held = {}
+        self.timings = DurationRing()
+
+    def rebuild(self, bindings):
+        """ bindings: iterable of (chord, on_press, on_release); empty chords are ignored. """
+        table = {}
+        for chord, on_press, on_release in bindings:
+            if chord: table.setdefault(parse_chord(chord), []).append((on_press, on_release))
+        self.table = {key: tuple(actions) for key, actions in table.items()}
+
+    def press(self, key):
+        start = time.perf_counter_ns()
+        kid = key_id(key)
+        bit = MODIFIER_KEYS.get(kid, 0)
+        mask = self.mask & ~bit; self.mask |= bit
+        held = self.held.get(kid)
+        # A repeat refreshes the window, so a trigger whose release was lost recovers once it is let go
+        if held is not None and start - held[1] < REPEAT_WINDOW_NS:
+            self.held[kid] = (held[0], start); actions = None
+        else:
+            actions = self.table.get((mask, kid))
+            if actions is None and mask: actions = self.table.get((0, kid))
+            if actions is not None:
+                self.held[kid] = (actions, start)
+                for on_press, _ in actions: on_press()
+        self.timings.record(time.perf_counter_ns() - start)
+        return actions is not None
+
+    def release(self, key):
+        start = time.perf_counter_ns()
+        kid = key_id(key)
+        bit = MODIFIER_KEYS.get(kid)
+        if bit: self.mask &= ~bit
+        held = self.held.pop(kid, None)
+        if held is not None:
+            for _, on_release in held[0]: on_release()
+        self.timings.record(time.perf_counter_ns() - start)
+        return held is not None
+
+class ChordCapture:
+    """ Listener callbacks that turn the next key press, with any held modifiers, into a chord.
+
+    A modifier pressed and released on its own becomes a trigger by itself. `on_done`
+    receives the chord string; on_press/on_release return False once it has been called
+    so a pynput listener stops.
+    """
+    def __init__(self, on_done):
+        self.on_done = on_done
+        self.mask = 0
+        self.last_modifier = None
+
+    def on_press(self, key):
+        kid = key_id(key)
+        if kid is None: return None
+        bit = MODIFIER_KEYS.get(kid)
+        if bit:
+            self.mask |= bit; self.last_modifier = kid; return None
+        self.on_done(format_chord(self.mask, kid))
+        return False
+
+    def on_release(self, key):
+        kid = key_id(key)
+        if kid is None or kid != self.last_modifier: return None
+        self.on_done(format_chord(self.mask & ~MODIFIER_KEYS[kid], kid))
+        return False
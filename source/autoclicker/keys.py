@@ -0,0 +1,15 @@
+# Keys are stored as pynput key names ("f6") or characters ("a"); see hotkeys.py for trigger chords.
+# pynput is imported inside the functions so that importing this module stays cheap.
+
+def key_to_str(key):
+    if key is None: return None
+    from pynput import keyboard
+    if isinstance(key, keyboard.Key): return key.name
+    if isinstance(key, keyboard.KeyCode): return key.char
+    return None
+
+def str_to_key(key_str):
+    if key_str is None: return None
+    from pynput import keyboard
+    try: return keyboard.Key[key_str]
+    except KeyError: return keyboard.KeyCode.from_char(key_str.replace("'", ""))
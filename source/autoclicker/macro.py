@@ -0,0 +1,308 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+
+from autoclicker.backends import (BUTTONS, EVENT_MOVE, EVENT_PRESS, EVENT_RELEASE, EVENT_SCROLL,
+                                  EVENT_KEY_DOWN, EVENT_KEY_UP)
+
+MACRO_VERSION = 1
+MACRO_SUFFIX = ".acm"
+STOP_KEY = "esc"
+# Mouse moves closer together than this are dropped while recording; the listener can
+# report 1000 moves a second and replaying every one of them adds nothing.
+MIN_MOVE_NS = 4_000_000
+
+# --- MACRO ---
+class Macro:
+    """ A recorded input stream held in typed parallel arrays, about 21 bytes per event.
+
+    times are nanoseconds since the start of the recording. x/y hold the cursor position,
+    or the wheel steps for scrolls. code holds the button index for mouse buttons and an
+    index into `keys` for key events.
+    """
+    def __init__(self, duration_ns=0):
+        self.times = array("q")
+        self.kinds = array("B")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.codes = array("i")
+        self.keys = []
+        self.key_codes = {}
+        self.duration_ns = duration_ns
+
+    def __len__(self):
+        return len(self.times)
+
+    def time_at(self, i):
+        return self.times[i]
+
+    def append(self, t, kind, x=0, y=0, code=0):
+        self.times.append(t); self.kinds.append(kind); self.xs.append(x); self.ys.append(y); self.codes.append(code)
+
+    def key_code(self, key):
+        code = self.key_codes.get(key)
+        if code is None:
+            code = self.key_codes[key] = len(self.keys); self.keys.append(key)
+        return code
+
+    def record(self, i):
+        return self.times[i], self.kinds[i], self.xs[i], self.ys[i], self.codes[i]
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.times, self.kinds, self.xs, self.ys, self.codes))
+
+    def to_dict(self):
+        """ Column lists that json can store; the layout is the same as the arrays. """
+        return {
+            "version": MACRO_VERSION, "duration_ns": self.duration_ns, "keys": list(self.keys),
+            "t": self.times.tolist(), "kind": self.kinds.tolist(), "x": self.xs.tolist(),
+            "y": self.ys.tolist(), "code": self.codes.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        if d.get("version") != MACRO_VERSION:
+            raise ValueError(f"Unsupported macro version: {d.get('version')!r}")
+        macro = cls(d.get("duration_ns", 0))
+        macro.times.extend(d["t"]); macro.kinds.extend(d["kind"]); macro.xs.extend(d["x"])
+        macro.ys.extend(d["y"]); macro.codes.extend(d["code"])
+        if not len(macro.times) == len(macro.kinds) == len(macro.xs) == len(macro.ys) == len(macro.codes):
+            raise ValueError("Macro columns have different lengths")
+        for key in d.get("keys", []): macro.key_code(key)
+        return macro
+
+# --- BINARY FORMAT ---
+# Little-endian throughout. A fixed header, then `count` fixed-width records in event
+# order, then the key table as a length-prefixed UTF-8 JSON list:
+#   header: magic, version, record size, reserved, count, duration_ns, key table offset
+#   record: time_ns (q), kind (B), 3 pad bytes, x (i), y (i), code (i)
+MAGIC = b"ACMACRO\0"
+HEADER = struct.Struct("<8sHHIQqQ")
+RECORD = struct.Struct("<qB3xiii")
+KEY_TABLE_LENGTH = struct.Struct("<I")
+
+def write_macro(macro, path):
+    """ Write a macro in the binary format via a temp file and rename. """
+    count = len(macro)
+    keys_offset = HEADER.size + count * RECORD.size
+    key_table = json.dumps(list(macro.keys)).encode("utf-8")
+    buf = bytearray(keys_offset + KEY_TABLE_LENGTH.size + len(key_table))
+    HEADER.pack_into(buf, 0, MAGIC, MACRO_VERSION, RECORD.size, 0, count, macro.duration_ns, keys_offset)
+    pack_record = RECORD.pack_into
+    for i in range(count):
+        pack_record(buf, HEADER.size + i * RECORD.size, *macro.record(i))
+    KEY_TABLE_LENGTH.pack_into(buf, keys_offset, len(key_table))
+    buf[keys_offset + KEY_TABLE_LENGTH.size:] = key_table
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=MACRO_SUFFIX, dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(buf); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+class MappedMacro:
+    """ A binary macro file mapped into memory.
+
+    Opening it only parses the header and key table; records are unpacked one at a time
+    as the player reaches them, and the OS pages the file in as it is read. Same
+    interface as Macro for everything a player needs.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, record_size, _, count, duration_ns, keys_offset = HEADER.unpack_from(self.mm, 0)
+            if magic != MAGIC: raise ValueError(f"{path} is not a macro file")
+            if version != MACRO_VERSION: raise ValueError(f"Unsupported macro version: {version}")
+            if record_size != RECORD.size or keys_offset != HEADER.size + count * RECORD.size:
+                raise ValueError(f"{path} has an invalid record layout")
+            (key_table_length,) = KEY_TABLE_LENGTH.unpack_from(self.mm, keys_offset)
+            start = keys_offset + KEY_TABLE_LENGTH.size
+            self.keys = json.loads(self.mm[start:start + key_table_length].decode("utf-8"))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            self.mm.close()
+            raise ValueError(f"{path} is truncated or corrupt: {e}")
+        except ValueError:
+            self.mm.close(); raise
+        self.count = count
+        self.duration_ns = duration_ns
+        self.unpack_record = RECORD.unpack_from
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        if i < 0: i += self.count
+        return self.unpack_record(self.mm, HEADER.size + i * RECORD.size)
+
+    def time_at(self, i):
+        return self.record(i)[0]
+
+    def nbytes(self):
+        return len(self.mm)
+
+    def to_macro(self):
+        """ Fully load the file into an in-memory Macro. """
+        macro = Macro(self.duration_ns)
+        for key in self.keys: macro.key_code(key)
+        for i in range(self.count): macro.append(*self.record(i))
+        return macro
+
+    def to_dict(self):
+        return self.to_macro().to_dict()
+
+    def close(self):
+        self.mm.close()
+
+def read_macro_json(path):
+    with open(path, 'r') as f: return Macro.from_dict(json.load(f))
+
+def write_macro_json(macro, path):
+    with open(path, 'w') as f: json.dump(macro.to_dict(), f, indent=1)
+
+# --- RECORDER ---
+class MacroRecorder:
+    """ Records mouse and keyboard input into a Macro with pynput listeners.
+
+    Recording ends when `stop_key` is pressed (it is not recorded) or stop() is called;
+    `on_stopped` is then called from a listener thread.
+    """
+    def __init__(self, stop_key=STOP_KEY, min_move_ns=MIN_MOVE_NS, on_stopped=None):
+        self.stop_key = stop_key
+        self.min_move_ns = min_move_ns
+        self.on_stopped = on_stopped
+        self.macro = None
+        self.lock = threading.Lock()
+        self.mouse_listener = None
+        self.keyboard_listener = None
+        self.start_ns = 0
+        self.last_move_ns = 0
+        self.button_codes = {name: i for i, name in enumerate(BUTTONS)}
+
+    @property
+    def recording(self):
+        return self.keyboard_listener is not None
+
+    def start(self):
+        from pynput import mouse, keyboard
+        self.macro = Macro()
+        self.start_ns = time.perf_counter_ns(); self.last_move_ns = -self.min_move_ns
+        self.mouse_listener = mouse.Listener(on_move=self.on_move, on_click=self.on_click, on_scroll=self.on_scroll)
+        self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
+        self.mouse_listener.daemon = True; self.keyboard_listener.daemon = True
+        self.mouse_listener.start(); self.keyboard_listener.start()
+
+    def stop(self):
+        """ Stop recording and return the macro. Safe to call from a listener callback. """
+        with self.lock:
+            if not self.recording: return self.macro
+            self.macro.duration_ns = time.perf_counter_ns() - self.start_ns
+            listeners = (self.mouse_listener, self.keyboard_listener)
+            self.mouse_listener = self.keyboard_listener = None
+        for listener in listeners: listener.stop()
+        if self.on_stopped: self.on_stopped(self.macro)
+        return self.macro
+
+    def record(self, kind, x=0, y=0, code=0):
+        t = time.perf_counter_ns() - self.start_ns
+        with self.lock:
+            if self.recording: self.macro.append(t, kind, x, y, code)
+        return t
+
+    # --- LISTENER CALLBACKS ---
+    def on_move(self, x, y):
+        now = time.perf_counter_ns() - self.start_ns
+        if now - self.last_move_ns < self.min_move_ns: return
+        self.last_move_ns = self.record(EVENT_MOVE, int(x), int(y))
+
+    def on_click(self, x, y, button, pressed):
+        code = self.button_codes.get(button.name)
+        if code is None: return
+        # The position is recorded as a move first so a replay clicks in the same spot.
+        self.record(EVENT_MOVE, int(x), int(y))
+        self.record(EVENT_PRESS if pressed else EVENT_RELEASE, int(x), int(y), code)
+
+    def on_scroll(self, x, y, dx, dy):
+        self.record(EVENT_SCROLL, int(dx), int(dy))
+
+    def on_press(self, key):
+        from autoclicker.keys import key_to_str
+        name = key_to_str(key)
+        if name == self.stop_key:
+            self.stop(); return False
+        if name is not None:
+            with self.lock: code = self.macro.key_code(name)
+            self.record(EVENT_KEY_DOWN, code=code)
+
+    def on_release(self, key):
+        from autoclicker.keys import key_to_str
+        name = key_to_str(key)
+        if name is not None and name != self.stop_key:
+            with self.lock: code = self.macro.key_code(name)
+            self.record(EVENT_KEY_UP, code=code)
+
+# --- PLAYER ---
+class MacroPlayer:
+    """ Engine task that replays a Macro with its recorded gaps divided by `speed`.
+
+    `repeat` is the number of passes, 0 to loop until stopped. Replays use the engine's
+    deadline scheduling, so timing errors do not add up over a long macro. Events are read
+    one record at a time, so a MappedMacro is streamed from its file.
+    """
+    def __init__(self, macro, backend, speed=1.0, repeat=1):
+        if len(macro) == 0: raise ValueError("The macro is empty")
+        if speed <= 0: raise ValueError("Playback speed must be positive")
+        self.macro = macro
+        self.backend = backend
+        self.speed = speed
+        self.repeat = repeat
+        self.pos = 0
+        self.loops_done = 0
+        # The gap between the last event and the end of the recording separates loops.
+        self.loop_gap_ns = max(0, macro.duration_ns - macro.time_at(-1))
+        self.next_record = macro.record(0)
+        self.flush = backend.flush
+        # Buttons and keys pressed by the replay and not released yet, for cancel()
+        self.held_buttons = set()
+        self.held_keys = set()
+
+    def tick(self):
+        m = self.macro
+        t, kind, x, y, code = self.next_record
+        if kind == EVENT_MOVE: self.backend.move(x, y)
+        elif kind == EVENT_PRESS: self.backend.press(BUTTONS[code]); self.held_buttons.add(code)
+        elif kind == EVENT_RELEASE: self.backend.release(BUTTONS[code]); self.held_buttons.discard(code)
+        elif kind == EVENT_SCROLL: self.backend.scroll(x, y)
+        elif kind == EVENT_KEY_DOWN: self.backend.key_down(m.keys[code]); self.held_keys.add(code)
+        elif kind == EVENT_KEY_UP: self.backend.key_up(m.keys[code]); self.held_keys.discard(code)
+
+        i = self.pos + 1
+        if i < len(m):
+            self.next_record = m.record(i)
+            gap = self.next_record[0] - t
+        else:
+            self.loops_done += 1
+            if self.repeat and self.loops_done >= self.repeat: return None
+            i = 0; self.next_record = m.record(0)
+            gap = self.loop_gap_ns + self.next_record[0]
+        self.pos = i
+        return int(gap / self.speed)
+
+    def move_lead(self, interval_ns):
+        return None
+
+    def cancel(self):
+        # Stopped between a press and its release
+        for code in self.held_buttons: self.backend.release(BUTTONS[code])
+        for code in self.held_keys: self.backend.key_up(self.macro.keys[code])
+        self.held_buttons.clear(); self.held_keys.clear()
@@ -0,0 +1,28 @@
+import functools
+
+# --- EASING CURVES ---
+# Each maps progress t in (0, 1] to the fraction of the distance covered.
+EASINGS = {
+    "Linear": lambda t: t,
+    "Ease In": lambda t: t * t,
+    "Ease Out": lambda t: 1 - (1 - t) * (1 - t),
+    "Ease In-Out": lambda t: t * t * (3 - 2 * t),
+}
+
+# "Teleport" jumps straight to the target with a single move.
+MOVE_MODES = tuple(EASINGS) + ("Teleport",)
+
+@functools.lru_cache(maxsize=64)
+def easing_table(easing, steps):
+    """ Fractions of the distance covered after each of `steps` steps, computed once per curve. """
+    curve = EASINGS[easing]
+    return tuple(curve(i / steps) for i in range(1, steps + 1))
+
+def plan_path(start, end, steps, easing="Linear"):
+    """ Precompute every integer cursor position from start to end (inclusive of end). """
+    end_x, end_y = int(end[0]), int(end[1])
+    if easing == "Teleport" or steps <= 1:
+        return [(end_x, end_y)]
+    start_x, start_y = start
+    dx, dy = end_x - start_x, end_y - start_y
+    return [(int(start_x + dx * f), int(start_y + dy * f)) for f in easing_table(easing, steps)]
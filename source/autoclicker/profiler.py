@@ -0,0 +1,117 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+# 100 samples a second: fine enough for spikes of a few tens of milliseconds, and 1-2% of a core to take
+PROFILE_INTERVAL = 0.01
+PROFILE_DIR = "cpu-profiles"
+IDLE_FRAME = "(idle)"
+
+def default_profile_path():
+    return os.path.join(PROFILE_DIR, time.strftime("threads-%Y%m%d-%H%M%S.folded"))
+
+class ThreadClocks:
+    """ CPU time of the threads of this process from Linux schedstat, None where that is not available.
+
+    The schedstat files stay open and are reread with pread, which is an order of
+    magnitude cheaper than opening them for every sample.
+    """
+    def __init__(self):
+        self.fds = {}
+
+    def cpu_ns(self, native_id):
+        fd = self.fds.get(native_id)
+        try:
+            if fd is None: fd = self.fds[native_id] = os.open(f"/proc/self/task/{native_id}/schedstat", os.O_RDONLY)
+            return int(os.pread(fd, 64, 0).split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def retain(self, native_ids):
+        """ Close the files of threads that are gone. """
+        for native_id in self.fds.keys() - native_ids: os.close(self.fds.pop(native_id))
+
+    def close(self):
+        self.retain(())
+
+class ThreadSampler:
+    """ Sampling profiler for every thread of the process: the GUI, the key listeners, the click engine, the watcher.
+
+    A daemon thread wakes every `interval` seconds, takes the current frame of each other
+    thread from sys._current_frames() and counts the stack under the thread's name, so
+    nothing is installed in the sampled threads and they run unchanged between samples.
+    Starting and stopping can happen at any time while clickers run. On Linux, samples of
+    a thread that used no CPU since the previous one end in an "(idle)" frame, which
+    separates waiting on a lock or an event from work. write() saves the counts in the
+    folded format read by flamegraph.pl, speedscope and inferno.
+    """
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.code_names = {}
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        if self.thread is not None: return
+        self.stacks.clear(); self.samples = 0; self.duration = 0.0
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="ThreadSampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop sampling and return self, for write(). """
+        if self.thread is None: return self
+        self.stop_event.set(); self.thread.join(); self.thread = None
+        return self
+
+    def frame_name(self, code):
+        name = self.code_names.get(code)
+        if name is None:
+            name = f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            name = self.code_names[code] = name.replace(";", ":")
+        return name
+
+    def run(self):
+        me = threading.get_ident()
+        clocks = ThreadClocks() if sys.platform.startswith("linux") else None
+        cpu_seen = {}
+        started = next_sample = time.perf_counter()
+        while not self.stop_event.wait(max(0.0, next_sample - time.perf_counter())):
+            threads = {t.ident: t for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me: continue
+                thread = threads.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(self.frame_name(frame.f_code)); frame = frame.f_back
+                stack.append(thread.name.replace(";", ":") if thread else f"Thread {ident}")
+                stack.reverse()
+                cpu = clocks.cpu_ns(thread.native_id) if clocks and thread and thread.native_id else None
+                if cpu is not None:
+                    if cpu == cpu_seen.get(ident): stack.append(IDLE_FRAME)
+                    cpu_seen[ident] = cpu
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+            if clocks: clocks.retain({t.native_id for t in threads.values()})
+            # Skip samples that are already overdue instead of taking them back to back
+            next_sample += self.interval
+            now = time.perf_counter()
+            if next_sample < now: next_sample = now + self.interval
+        self.duration = time.perf_counter() - started
+        if clocks: clocks.close()
+
+    def write(self, path):
+        """ Save the stacks in folded format, one "thread;outer;...;inner count" line each. Returns the path. """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()): f.write(f"{stack} {count}\n")
+        return path
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+
+from autoclicker.macro import MACRO_SUFFIX, MappedMacro, write_macro
+
+PROFILE_DIR = "profiles"
+LEGACY_PROFILE_FILE = "profiles.json"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+MACRO_DIR = "macros"
+
+def atomic_write_json(path, data, indent=None):
+    """ Write JSON to a temp file next to `path` and rename it over `path`, so readers and
+    crashes only ever see the old file or the complete new one. """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+def profile_file_name(name):
+    # Readable prefix for humans, hash suffix so different names never share a file
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_")[:40] or "profile"
+    return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}.json"
+
+def macro_files(settings):
+    """ Names of the macro files a profile's settings reference. """
+    macros = settings.get("macros") if isinstance(settings, dict) else None
+    if not isinstance(macros, dict): return set()
+    return {data["file"] for data in macros.values() if isinstance(data, dict) and "file" in data}
+
+class ProfileStore:
+    """ Profiles stored as one JSON file each, plus an index.json with their order.
+
+    Saving one profile rewrites only that profile's file (and the index when a profile is
+    added or removed or its macros change), each atomically. Saves are coalesced: put() and delete() only mark
+    changes and a flush runs `debounce` seconds after the first of a burst. Profiles are
+    read from disk the first time they are asked for. A legacy profiles.json is imported
+    the first time the directory is created.
+
+    Macros are kept out of the profile JSON as binary files under macros/, referenced by
+    file name. A macro file is never rewritten, so one that is mapped for playback
+    stays valid after the profile is saved again. Profiles can share a macro file, so
+    the index also lists the macro files of every profile; once a profile is deleted or
+    drops a macro, the next flush removes the files no entry lists any more, without
+    reading a single profile file.
+    """
+    def __init__(self, directory=PROFILE_DIR, legacy_file=LEGACY_PROFILE_FILE, debounce=0.5):
+        self.directory = directory
+        self.debounce = debounce
+        self.lock = threading.RLock()
+        self.files = {}
+        # Macro files each profile references, None where an older index did not list them
+        self.macro_refs = {}
+        self.cache = {}
+        self.dirty = set()
+        self.removed = set()
+        self.index_dirty = False
+        # Set when a profile dropped a reference to a macro file, which may have been the last
+        self.macros_dirty = False
+        # Macro files written this session that no saved profile references yet
+        self.fresh_macros = set()
+        self.timer = None
+        self.load_index(legacy_file)
+
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def load_index(self, legacy_file):
+        if os.path.exists(self.index_path()):
+            try:
+                with open(self.index_path(), 'r') as f: index = json.load(f)
+                self.files = {entry["name"]: entry["file"] for entry in index["profiles"]}
+                self.macro_refs = {entry["name"]: set(entry["macros"]) if "macros" in entry else None for entry in index["profiles"]}
+                return
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print(f"Error reading {self.index_path()}. Rebuilding it from the profile files.")
+                self.rebuild_index(); return
+        if legacy_file and os.path.exists(legacy_file):
+            try:
+                with open(legacy_file, 'r') as f: legacy = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error reading {legacy_file}. It will not be imported."); return
+            for name, settings in legacy.items(): self.put(name, settings)
+            self.flush()
+
+    def rebuild_index(self):
+        self.files = {}; self.macro_refs = {}
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith(".json") or file_name == INDEX_FILE or file_name.startswith(".tmp-"): continue
+            try:
+                with open(os.path.join(self.directory, file_name), 'r') as f: data = json.load(f)
+                self.files[data["name"]] = file_name; self.macro_refs[data["name"]] = macro_files(data.get("settings"))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError, OSError):
+                print(f"Skipping unreadable profile file {file_name}.")
+        self.index_dirty = True
+        self.flush()
+
+    # --- READING ---
+    def names(self):
+        with self.lock: return list(self.files)
+
+    def __contains__(self, name):
+        with self.lock: return name in self.files
+
+    def __len__(self):
+        with self.lock: return len(self.files)
+
+    def get(self, name):
+        """ Settings of one profile, read from disk on first use. Returns None if it cannot be read. """
+        with self.lock:
+            if name in self.cache: return self.cache[name]
+            if name not in self.files: return None
+            path = os.path.join(self.directory, self.files[name])
+            try:
+                with open(path, 'r') as f: settings = json.load(f)["settings"]
+            except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                print(f"Error reading profile '{name}' from {path}."); return None
+            self.cache[name] = settings
+            return settings
+
+    def load_all(self):
+        return {name: self.get(name) for name in self.names()}
+
+    # --- WRITING ---
+    def put(self, name, settings):
+        with self.lock:
+            if name not in self.files:
+                self.files[name] = profile_file_name(name); self.index_dirty = True
+            files = macro_files(settings)
+            self.fresh_macros -= files
+            old = self.macro_refs.get(name, set())
+            self.macro_refs[name] = files
+            if old != files:
+                self.index_dirty = True
+                if old is None or old - files: self.macros_dirty = True
+            self.cache[name] = settings
+            self.dirty.add(name)
+            self.removed.discard(self.files[name])
+            self.schedule_flush()
+
+    def delete(self, name):
+        with self.lock:
+            file_name = self.files.pop(name, None)
+            if file_name is None: return
+            self.cache.pop(name, None); self.dirty.discard(name)
+            self.removed.add(file_name); self.index_dirty = True
+            if self.macro_refs.pop(name, set()) != set(): self.macros_dirty = True
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.debounce <= 0:
+            self.flush(); return
+        if self.timer is None:
+            self.timer = threading.Timer(self.debounce, self.flush); self.timer.daemon = True; self.timer.start()
+
+    def flush(self):
+        """ Write every pending change now. What cannot be written is reported and retried on the next flush. """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel(); self.timer = None
+            if not (self.dirty or self.removed or self.index_dirty or self.macros_dirty): return
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError as e:
+                print(f"Could not save profiles to {self.directory}: {e}"); return
+            for name in list(self.dirty):
+                try:
+                    atomic_write_json(os.path.join(self.directory, self.files[name]), {"name": name, "settings": self.cache[name]}, indent=4)
+                    self.dirty.discard(name)
+                except OSError as e:
+                    print(f"Could not save profile '{name}': {e}")
+            # Only once every profile is on disk, so a reference kept in a failed write is not lost
+            referenced = self.referenced_macros() if self.macros_dirty and not self.dirty else None
+            if self.index_dirty:
+                index = {"version": INDEX_VERSION, "profiles": [self.index_entry(name, file_name) for name, file_name in self.files.items()]}
+                try:
+                    atomic_write_json(self.index_path(), index, indent=4)
+                    self.index_dirty = False
+                except OSError as e:
+                    print(f"Could not save {self.index_path()}: {e}"); return
+            # Files are only removed once the index no longer points at them
+            for file_name in self.removed:
+                try: os.remove(os.path.join(self.directory, file_name))
+                except OSError: pass
+            self.removed.clear()
+            if referenced is not None: self.prune_macros(referenced)
+
+    def index_entry(self, name, file_name):
+        entry = {"name": name, "file": file_name}
+        if self.macro_refs.get(name) is not None: entry["macros"] = sorted(self.macro_refs[name])
+        return entry
+
+    def close(self):
+        self.flush()
+
+    # --- MACROS ---
+    def macro_path(self, file_name):
+        return os.path.join(self.directory, MACRO_DIR, file_name)
+
+    def save_macro(self, macro):
+        """ Write a macro to a new file and return the name to reference it by. Raises OSError. """
+        os.makedirs(os.path.join(self.directory, MACRO_DIR), exist_ok=True)
+        file_name = uuid.uuid4().hex + MACRO_SUFFIX
+        write_macro(macro, self.macro_path(file_name))
+        with self.lock: self.fresh_macros.add(file_name)
+        return file_name
+
+    def discard_macro(self, file_name):
+        """ Drop a macro file the caller no longer needs. It is removed now if no profile was
+        ever saved with it, else by the flush after the last profile referencing it changes. """
+        with self.lock:
+            if file_name not in self.fresh_macros: return
+            self.fresh_macros.discard(file_name)
+            try: os.remove(self.macro_path(file_name))
+            except OSError: pass
+
+    def referenced_macros(self):
+        """ Every macro file some profile, or this session, still needs, from the index. Caller holds the lock.
+
+        Profiles listed by an older index without their macros are read once here, and
+        the index is rewritten with them. Returns None if one of them cannot be read,
+        since it might reference anything.
+        """
+        referenced = set(self.fresh_macros)
+        for name, files in self.macro_refs.items():
+            if files is None:
+                settings = self.get(name)
+                if settings is None:
+                    self.macros_dirty = False; return None
+                files = self.macro_refs[name] = macro_files(settings); self.index_dirty = True
+            referenced |= files
+        return referenced
+
+    def prune_macros(self, referenced):
+        """ Remove the macro files not in `referenced`. Caller holds the lock. """
+        self.macros_dirty = False
+        directory = os.path.join(self.directory, MACRO_DIR)
+        try:
+            on_disk = [name for name in os.listdir(directory) if name.endswith(MACRO_SUFFIX) and not name.startswith(".tmp-")]
+        except OSError:
+            return
+        for file_name in on_disk:
+            if file_name in referenced: continue
+            try: os.remove(os.path.join(directory, file_name))
+            except OSError: pass
+
+    def open_macro(self, file_name):
+        """ Map a macro file for streaming playback. Raises OSError or ValueError. """
+        return MappedMacro(self.macro_path(file_name))
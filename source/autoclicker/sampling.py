@@ -0,0 +1,98 @@
+import importlib.util
+import math
+import queue
+import random
+import threading
+
+# NumPy is optional; without it blocks are generated in pure Python with the same layout.
+# It is only imported when the first stream is created, since importing it costs more
+# than the rest of the headless runner's startup combined.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+np = None
+
+def load_numpy():
+    global np
+    if np is None and HAS_NUMPY:
+        import numpy as np
+    return np
+
+BLOCK_SIZE = 4096
+
+# --- BACKGROUND REFILL ---
+_refill_queue = queue.SimpleQueue()
+_refill_thread = None
+_refill_lock = threading.Lock()
+
+def _refill_worker():
+    while True:
+        _refill_queue.get().prefetch()
+
+def _schedule_refill(stream):
+    global _refill_thread
+    with _refill_lock:
+        if _refill_thread is None:
+            _refill_thread = threading.Thread(target=_refill_worker, name="SampleRefill", daemon=True)
+            _refill_thread.start()
+    _refill_queue.put(stream)
+
+def new_seed():
+    return random.randrange(2 ** 63)
+
+# --- SAMPLE STREAM ---
+class SampleStream:
+    """ Seeded stream of per-click random samples, generated in blocks.
+
+    Each sample is a tuple (u, dx, dy): u is uniform in [0, 1) and scales the random
+    interval, (dx, dy) is uniform over the area of the unit disk (radius sqrt(U), not U)
+    and scales the position jitter. Keeping samples in unit form means a config swap
+    never invalidates a block. The next block is generated on a background thread while
+    the current one is consumed, so a click only costs one list index.
+
+    The same seed replays the same samples on the same install; NumPy and pure Python
+    produce different sequences for one seed.
+    """
+    def __init__(self, seed=None, block_size=BLOCK_SIZE, use_numpy=HAS_NUMPY):
+        self.seed = new_seed() if seed is None else seed
+        self.block_size = block_size
+        if use_numpy and load_numpy() is not None:
+            self.rng = np.random.default_rng(self.seed); self.generate = self.generate_numpy
+        else:
+            self.rng = random.Random(self.seed); self.generate = self.generate_python
+        self.lock = threading.Lock()
+        self.pending = None
+        self.block = self.generate()
+        self.pos = 0
+        _schedule_refill(self)
+
+    def generate_numpy(self):
+        n = self.block_size
+        u = self.rng.random(n)
+        r = np.sqrt(self.rng.random(n))
+        theta = self.rng.random(n) * (2 * math.pi)
+        return list(zip(u.tolist(), (r * np.cos(theta)).tolist(), (r * np.sin(theta)).tolist()))
+
+    def generate_python(self):
+        rand = self.rng.random
+        block = []
+        for _ in range(self.block_size):
+            u = rand(); r = math.sqrt(rand()); theta = rand() * (2 * math.pi)
+            block.append((u, r * math.cos(theta), r * math.sin(theta)))
+        return block
+
+    def prefetch(self):
+        # Blocks are always generated in order under the lock, so the sequence does not
+        # depend on whether the background thread or the caller got there first.
+        with self.lock:
+            if self.pending is None:
+                self.pending = self.generate()
+
+    def next(self):
+        pos = self.pos
+        if pos == self.block_size:
+            with self.lock:
+                self.block = self.pending if self.pending is not None else self.generate()
+                self.pending = None
+            _schedule_refill(self)
+            pos = 0
+        self.pos = pos + 1
+        return self.block[pos]
@@ -0,0 +1,79 @@
+import datetime
+import time
+
+# --- MISSED CLICK POLICIES ---
+# "Catch Up" fires slots that were missed back-to-back (bounded by MAX_CATCH_UP) so the
+# long-run click count stays on the configured grid. "Skip" drops them and continues
+# from the next slot that is still due.
+MISSED_POLICIES = ("Catch Up", "Skip")
+
+# time.sleep() overshoots by up to about a millisecond, so the coarse sleep stops this
+# far ahead of the deadline and the rest is spun on perf_counter_ns.
+SPIN_THRESHOLD_NS = 2_000_000
+MAX_CATCH_UP = 10
+
+# Over a run of at least a few seconds, achieved CPS stays within this fraction of
+# 1 / interval as long as a single click takes less time than the interval.
+CPS_TOLERANCE = 0.01
+
+def wait_until(deadline_ns, spin_ns=SPIN_THRESHOLD_NS):
+    """ Block until perf_counter_ns() reaches deadline_ns: coarse sleep, then spin. """
+    remaining = deadline_ns - time.perf_counter_ns()
+    if remaining > spin_ns:
+        time.sleep((remaining - spin_ns) / 1e9)
+    while time.perf_counter_ns() < deadline_ns:
+        time.sleep(0)
+
+# --- SCHEDULED STARTS ---
+def perf_ns_at(timestamp):
+    """ The perf_counter_ns() value expected at wall-clock `timestamp` (seconds since the epoch).
+
+    The wall clock is only read once, here; the engine then waits on the monotonic clock,
+    so a clock adjustment after scheduling does not move the start.
+    """
+    return time.perf_counter_ns() + int((timestamp - time.time()) * 1e9)
+
+def parse_clock_time(text, now=None):
+    """ The next local time matching "HH:MM[:SS[.fff]]", today or tomorrow, as epoch seconds. Raises ValueError. """
+    for fmt in ("%H:%M:%S.%f", "%H:%M:%S", "%H:%M"):
+        try:
+            clock = datetime.datetime.strptime(text.strip(), fmt).time(); break
+        except ValueError:
+            pass
+    else:
+        raise ValueError(f"Start time must look like 14:00:00.000, not {text!r}")
+    now = datetime.datetime.now() if now is None else now
+    target = datetime.datetime.combine(now.date(), clock)
+    if target <= now: target += datetime.timedelta(days=1)
+    return target.timestamp()
+
+class DeadlineScheduler:
+    """ Absolute-deadline timeline for one clicker.
+
+    Each slot is placed relative to the previous deadline, not to when the previous
+    click finished, so the time spent clicking never accumulates into drift.
+    """
+    def __init__(self, policy="Catch Up", max_catch_up=MAX_CATCH_UP):
+        if policy not in MISSED_POLICIES:
+            raise ValueError(f"Unknown missed click policy: {policy!r}")
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.deadline = None
+        self.missed = 0
+
+    def start(self, now_ns=None):
+        self.deadline = time.perf_counter_ns() if now_ns is None else now_ns
+        self.missed = 0
+        return self.deadline
+
+    def advance(self, interval_ns, now_ns=None):
+        """ Step to the next slot and return its deadline, applying the missed click policy. """
+        self.deadline += interval_ns
+        now = time.perf_counter_ns() if now_ns is None else now_ns
+        behind = (now - self.deadline) // interval_ns if interval_ns > 0 else 0
+        if behind > 0:
+            # The slot that is currently due always fires; only whole slots behind it are dropped.
+            dropped = behind if self.policy == "Skip" else max(0, behind - self.max_catch_up)
+            self.deadline += dropped * interval_ns
+            self.missed += dropped
+        return self.deadline
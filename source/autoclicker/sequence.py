@@ -0,0 +1,170 @@
+import functools
+import math
+from collections import namedtuple
+
+from autoclicker.backends import BUTTONS
+from autoclicker.movement import plan_path
+from autoclicker.sampling import SampleStream
+
+# One target of a click sequence. hold is how long the button stays down, dwell how long
+# to wait after releasing it before travelling on; both in nanoseconds.
+SequencePoint = namedtuple("SequencePoint", "x y button hold_ns dwell_ns")
+
+# Cursor speed used to plan travel between points; travel time is part of the cycle.
+MOVE_SPEED = 4000 # px/s
+# 2-opt passes are O(n^2) each; past this many points only nearest neighbour is used
+TWO_OPT_LIMIT = 400
+MAX_TWO_OPT_PASSES = 50
+
+def parse_points(entries, default_button="left"):
+    """ SequencePoints from profile entries {"x", "y", "button", "hold", "dwell"} (seconds). Raises ValueError. """
+    points = []
+    for entry in entries:
+        button = entry.get("button", default_button)
+        if button not in BUTTONS: raise ValueError(f"Unknown mouse button in sequence: {button!r}")
+        hold, dwell = float(entry.get("hold", 0)), float(entry.get("dwell", 0.1))
+        if hold < 0 or dwell < 0: raise ValueError("Hold and dwell times cannot be negative")
+        points.append(SequencePoint(int(entry["x"]), int(entry["y"]), button, int(hold * 1e9), int(dwell * 1e9)))
+    return tuple(points)
+
+def point_entry(point):
+    return {"x": point.x, "y": point.y, "button": point.button, "hold": point.hold_ns / 1e9, "dwell": point.dwell_ns / 1e9}
+
+# --- ORDERING ---
+def tour_length(points, order):
+    """ Length of the closed loop visiting points in `order`, in pixels. """
+    return sum(math.dist(points[order[i - 1]][:2], points[order[i]][:2]) for i in range(len(order)))
+
+def nearest_neighbour(points, start=0):
+    unvisited = set(range(len(points))); unvisited.discard(start)
+    order = [start]
+    while unvisited:
+        x, y = points[order[-1]][:2]
+        nxt = min(unvisited, key=lambda j: (points[j].x - x) ** 2 + (points[j].y - y) ** 2)
+        order.append(nxt); unvisited.discard(nxt)
+    return order
+
+def two_opt(points, order, max_passes=MAX_TWO_OPT_PASSES):
+    """ Reverse segments of the loop while that makes it shorter. """
+    n = len(order)
+    if n < 4: return order
+    pos = [points[i][:2] for i in order]
+    dist = math.dist
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 1):
+            a, b = pos[i], pos[i + 1]
+            for j in range(i + 2, n if i else n - 1):
+                c, d = pos[j], pos[(j + 1) % n]
+                if dist(a, c) + dist(b, d) < dist(a, b) + dist(c, d) - 1e-9:
+                    order[i + 1:j + 1] = order[i + 1:j + 1][::-1]; pos[i + 1:j + 1] = pos[i + 1:j + 1][::-1]
+                    b = pos[i + 1]; improved = True
+        if not improved: break
+    return order
+
+@functools.lru_cache(maxsize=16)
+def optimize_order(points):
+    """ The points reordered to shorten the loop's total cursor travel; the first point stays first.
+
+    Nearest neighbour builds a tour, then 2-opt removes crossings. Cached on the point
+    tuple, so restarting the same sequence costs nothing.
+    """
+    if len(points) < 3: return points
+    order = nearest_neighbour(points)
+    if len(points) <= TWO_OPT_LIMIT: order = two_opt(points, order)
+    return tuple(points[i] for i in order)
+
+# --- ENGINE TASK ---
+class SequenceRun:
+    """ Engine task that clicks a list of points in a loop.
+
+    Each point is a press slot and, when it has a hold time, a release slot hold_ns
+    later. The gap to the next point's press is its dwell plus the travel time at
+    MOVE_SPEED, and the travel is spread over that gap as movement events, so the
+    optimizer's shorter loop directly shortens the cycle. num_clicks counts points
+    clicked; 0 loops until stopped.
+    """
+    def __init__(self, config, backend):
+        self.config = config
+        self.backend = backend
+        self.points = optimize_order(config.sequence) if config.optimize_order else config.sequence
+        # The config the points were planned from; a swapped-in config is re-planned by tick()
+        self.planned = config
+        self.pos = 0
+        # The button held down until the point's release slot, or None
+        self.pressed = None
+        # Set for the gap after a re-plan, which is all travel to the new current point
+        self.relocating = False
+        self.clicks_done = 0
+        self.samples = SampleStream(config.seed)
+        self.seed = self.samples.seed
+        self.sample = self.samples.next()
+        self.target = None
+        self.move = backend.move
+        self.flush = backend.flush
+
+    def swap_config(self, config):
+        # Only the reference is swapped here; the engine thread re-plans the points in tick()
+        self.config = config
+
+    def replan(self):
+        """ Take up changed points from a swapped-in config. Returns True when the loop was
+        interrupted: a held button was released and the current point may have moved. """
+        cfg, planned = self.config, self.planned
+        if cfg is planned: return False
+        self.planned = cfg
+        # An empty sequence ends sequence mode, which restarts the clicker instead; keep the old points meanwhile
+        if not cfg.sequence or (cfg.sequence == planned.sequence and cfg.optimize_order == planned.optimize_order): return False
+        if self.pressed is not None:
+            self.backend.release(self.pressed); self.pressed = None
+        self.points = optimize_order(cfg.sequence) if cfg.optimize_order else cfg.sequence
+        self.pos %= len(self.points)
+        return True
+
+    def target_of(self, point):
+        cfg = self.config
+        if not cfg.randomize_pos: return (point.x, point.y)
+        _, dx, dy = self.sample
+        return (point.x + dx * cfg.radius, point.y + dy * cfg.radius)
+
+    def travel_ns(self, start, end):
+        if self.config.move_mode == "Teleport": return 0
+        return int(math.dist(start, end) / MOVE_SPEED * 1e9)
+
+    def tick(self):
+        self.relocating = False
+        if self.replan():
+            self.relocating = True
+            self.target = self.target_of(self.points[self.pos])
+            return self.travel_ns(self.backend.cursor_position(), self.target)
+        point = self.points[self.pos]
+        if self.pressed is not None:
+            self.backend.release(self.pressed); self.pressed = None
+        elif point.hold_ns:
+            self.backend.press(point.button); self.pressed = point.button
+            return point.hold_ns
+        else:
+            self.backend.click(point.button)
+        self.clicks_done += 1
+        if 0 < self.config.num_clicks <= self.clicks_done: return None
+        self.pos = (self.pos + 1) % len(self.points)
+        self.sample = self.samples.next()
+        self.target = self.target_of(self.points[self.pos])
+        return point.dwell_ns + self.travel_ns((point.x, point.y), self.target)
+
+    def move_lead(self, interval_ns):
+        if self.pressed is not None: return None # The button is held; the cursor stays put until release
+        if self.relocating: return interval_ns
+        if interval_ns is None:
+            self.target = self.target_of(self.points[self.pos])
+            return self.travel_ns(self.backend.cursor_position(), self.target)
+        # The dwell is spent at the old point, the rest of the gap travelling
+        return max(0, interval_ns - self.points[self.pos - 1].dwell_ns)
+
+    def cancel(self):
+        # Stopped while a point's button is held down
+        if self.pressed is not None:
+            self.backend.release(self.pressed); self.pressed = None
+
+    def plan_move(self):
+        return plan_path(self.backend.cursor_position(), self.target, self.backend.move_steps, self.config.move_mode)
@@ -0,0 +1,101 @@
+import time
+from array import array
+
+# Enough for ten seconds at 100 CPS; older clicks are overwritten.
+WINDOW = 1024
+HOOK_WINDOW = 256
+# A click counts as late once it fires a whole interval after its deadline, and never under this
+LATE_MIN_NS = 1_000_000
+
+def percentile(sorted_values, p):
+    """ Nearest-rank percentile of an already sorted sequence. """
+    if not sorted_values: return 0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))]
+
+class ClickTelemetry:
+    """ Timing of the last `window` clicks of one job, in preallocated ring buffers.
+
+    For every click the engine records when it was due and when it was dispatched. From
+    those the ring keeps the achieved interval since the previous click, the jitter (how
+    far that interval is from the scheduled one) and the overshoot (how late the click
+    was against its deadline). A click fired more than one scheduled interval after its
+    deadline, when its successor should already have gone, is counted as late; under
+    "Catch Up" that is how missed deadlines show, since no slot is ever dropped.
+    Recording only writes into arrays, so nothing is allocated per click; all the
+    statistics are worked out in snapshot().
+    """
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.intervals = array("q", bytes(8 * window))
+        self.jitters = array("q", bytes(8 * window))
+        self.overshoots = array("q", bytes(8 * window))
+        self.pos = 0
+        self.filled = 0
+        self.clicks = 0
+        self.late = 0
+        self.last_deadline = 0
+        self.last_time = 0
+        self.started_ns = time.perf_counter_ns()
+
+    def record(self, deadline_ns, now_ns):
+        if self.clicks:
+            i = self.pos
+            interval = now_ns - self.last_time
+            self.intervals[i] = interval
+            self.jitters[i] = abs(interval - (deadline_ns - self.last_deadline))
+            self.overshoots[i] = overshoot = now_ns - deadline_ns
+            if overshoot > max(deadline_ns - self.last_deadline, LATE_MIN_NS): self.late += 1
+            self.pos = i + 1 if i + 1 < self.window else 0
+            if self.filled < self.window: self.filled += 1
+        self.clicks += 1
+        self.last_deadline = deadline_ns; self.last_time = now_ns
+
+    def snapshot(self, dropped=0):
+        """ Statistics over the window as a dict of plain numbers, times in milliseconds.
+
+        cps is the achieved rate over the intervals in the window, not the configured one.
+        `dropped` is the number of slots the scheduler skipped; missed is those plus the
+        late clicks.
+        """
+        n = self.filled
+        intervals = self.intervals[:n]; jitters = sorted(self.jitters[:n]); overshoots = sorted(self.overshoots[:n])
+        span = sum(intervals)
+        return {
+            "clicks": self.clicks,
+            "missed": dropped + self.late,
+            "dropped": dropped,
+            "late": self.late,
+            "cps": n * 1e9 / span if span > 0 else 0.0,
+            "jitter_p50_ms": percentile(jitters, 50) / 1e6,
+            "jitter_p95_ms": percentile(jitters, 95) / 1e6,
+            "jitter_p99_ms": percentile(jitters, 99) / 1e6,
+            "overshoot_p50_ms": percentile(overshoots, 50) / 1e6,
+            "overshoot_max_ms": (overshoots[-1] if overshoots else 0) / 1e6,
+            "running_s": (time.perf_counter_ns() - self.started_ns) / 1e9,
+        }
+
+class DurationRing:
+    """ The last `window` durations of some short operation, e.g. a keyboard hook callback. """
+    def __init__(self, window=HOOK_WINDOW):
+        self.window = window
+        self.durations = array("q", bytes(8 * window))
+        self.pos = 0
+        self.filled = 0
+        self.calls = 0
+
+    def record(self, duration_ns):
+        i = self.pos
+        self.durations[i] = duration_ns
+        self.pos = i + 1 if i + 1 < self.window else 0
+        if self.filled < self.window: self.filled += 1
+        self.calls += 1
+
+    def snapshot(self):
+        """ Count and p50/p99/max of the window, in microseconds. """
+        durations = sorted(self.durations[:self.filled])
+        return {
+            "calls": self.calls,
+            "p50_us": percentile(durations, 50) / 1e3,
+            "p99_us": percentile(durations, 99) / 1e3,
+            "max_us": (durations[-1] if durations else 0) / 1e3,
+        }
@@ -0,0 +1,85 @@
+import json
+import os
+import time
+from array import array
+
+# Records kept while tracing, about 10 MB of arrays; a couple of minutes at 1000 CPS. The oldest are overwritten.
+TRACE_CAPACITY = 1 << 18
+TRACE_CLICK, TRACE_MOVE, TRACE_FLUSH = range(3)
+KIND_NAMES = ("click", "move", "flush")
+ENGINE_TRACK = 0
+TRACE_DIR = "traces"
+
+def default_trace_path():
+    return os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+
+class TraceBuffer:
+    """ Engine timeline in preallocated parallel arrays, for finding out who was late.
+
+    Each record is one engine event: the deadline it was scheduled for, when the engine
+    thread woke up to run it, and when the call into the task (and so the backend)
+    started and returned. Clicks and movement steps go on the track of their job, backend
+    flushes on the engine's own track. Recording only writes into the arrays, and
+    while tracing is off the engine has no buffer at all, so it costs one None check per
+    event. Export with write_chrome_trace() and open the file in ui.perfetto.dev or
+    chrome://tracing.
+    """
+    def __init__(self, capacity=TRACE_CAPACITY):
+        self.capacity = capacity
+        self.kinds = array("b", bytes(capacity))
+        self.tracks = array("i", bytes(4 * capacity))
+        self.details = array("i", bytes(4 * capacity))
+        self.deadlines = array("q", bytes(8 * capacity))
+        self.wakes = array("q", bytes(8 * capacity))
+        self.starts = array("q", bytes(8 * capacity))
+        self.ends = array("q", bytes(8 * capacity))
+        self.pos = 0
+        self.count = 0
+        self.track_ids = {}
+        self.track_names = ["Click engine"]
+
+    def track(self, job):
+        """ Track number of a job's key, so every run of one clicker shares a timeline. Named after the key's title when it has one. """
+        track = self.track_ids.get(job.key)
+        if track is None:
+            track = self.track_ids[job.key] = len(self.track_names)
+            key = job.key; title = getattr(key, "title", None)
+            name = title if isinstance(title, str) and title else key if isinstance(key, str) else type(key).__name__
+            self.track_names.append(f"{name} #{track}")
+        return track
+
+    def record(self, kind, track, detail, deadline, wake, start, end):
+        i = self.pos
+        self.kinds[i] = kind; self.tracks[i] = track; self.details[i] = detail
+        self.deadlines[i] = deadline; self.wakes[i] = wake; self.starts[i] = start; self.ends[i] = end
+        self.pos = i + 1 if i + 1 < self.capacity else 0
+        self.count += 1
+
+    def indexes(self):
+        """ Buffer positions of the kept records, oldest first. """
+        if self.count <= self.capacity: return range(self.count)
+        return [*range(self.pos, self.capacity), *range(self.pos)]
+
+    def chrome_trace(self):
+        """ The records as a Chrome trace-event dict. Times are in microseconds from the first record. """
+        indexes = self.indexes()
+        origin = min((self.deadlines[i] for i in indexes), default=0)
+        us = lambda ns: (ns - origin) / 1000
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "Autoclicker"}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}} for tid, name in enumerate(self.track_names)]
+        for i in indexes:
+            kind, tid = self.kinds[i], self.tracks[i]
+            deadline, wake, start, end = self.deadlines[i], self.wakes[i], self.starts[i], self.ends[i]
+            args = {"deadline_us": us(deadline), "wake_late_us": (wake - deadline) / 1000, "call_late_us": (start - deadline) / 1000}
+            if kind == TRACE_MOVE: args["step"] = self.details[i]
+            events.append({"name": "deadline", "cat": KIND_NAMES[kind], "ph": "i", "s": "t", "pid": 1, "tid": tid, "ts": us(deadline)})
+            if start > deadline:
+                # Time between the deadline and the call: the scheduler waking late, or earlier events of the batch
+                events.append({"name": "late", "cat": "latency", "ph": "X", "pid": 1, "tid": tid, "ts": us(deadline), "dur": (start - deadline) / 1000})
+            events.append({"name": KIND_NAMES[kind], "cat": KIND_NAMES[kind], "ph": "X", "pid": 1, "tid": tid, "ts": us(start), "dur": (end - start) / 1000, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"records": self.count, "dropped": max(0, self.count - self.capacity)}}
+
+    def write_chrome_trace(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f: json.dump(self.chrome_trace(), f)
+        return path
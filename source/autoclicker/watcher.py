@@ -0,0 +1,275 @@
+import threading
+import time
+from collections import namedtuple
+
+from autoclicker.sampling import load_numpy
+from autoclicker.telemetry import DurationRing
+
+# A screen rectangle to watch. mode "color": matches while at least `fraction` of its pixels
+# are within `tolerance` of `color` on every channel. mode "change": matches while at least
+# `fraction` of its pixels differ by more than `tolerance` from how they looked when watching started.
+WatchRegion = namedtuple("WatchRegion", "x y width height mode color tolerance fraction")
+
+WATCH_MODES = ("color", "change")
+WATCH_FPS = 20
+# Frames are compared with the previous one in square tiles of this many pixels; only
+# regions that overlap a changed tile are evaluated again. With a multiple of 8 rows are
+# compared eight bytes at a time.
+TILE = 16
+
+def parse_color(text):
+    """ (r, g, b) from "#rrggbb" or a list of three numbers. Raises ValueError. """
+    if isinstance(text, str):
+        text = text.strip().lstrip("#")
+        if len(text) != 6: raise ValueError(f"Colors look like #ff8800, not {text!r}")
+        return tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+    color = tuple(int(c) for c in text)
+    if len(color) != 3 or not all(0 <= c <= 255 for c in color): raise ValueError(f"Not an RGB color: {text!r}")
+    return color
+
+def format_color(color):
+    return "#%02x%02x%02x" % tuple(color)
+
+def parse_regions(entries):
+    """ WatchRegions from profile entries {"x", "y", "width", "height", "mode", "color", "tolerance", "fraction"}. Raises ValueError. """
+    regions = []
+    for entry in entries:
+        mode = entry.get("mode", "color")
+        if mode not in WATCH_MODES: raise ValueError(f"Unknown watch mode: {mode!r}")
+        width, height = int(entry.get("width", 1)), int(entry.get("height", 1))
+        if width < 1 or height < 1: raise ValueError("Watched regions must be at least 1x1 px")
+        tolerance, fraction = int(entry.get("tolerance", 16)), float(entry.get("fraction", 0.5))
+        if not 0 <= tolerance <= 255: raise ValueError("Tolerance must be between 0 and 255")
+        if not 0 < fraction <= 1: raise ValueError("The matching fraction must be above 0 and at most 1")
+        regions.append(WatchRegion(int(entry["x"]), int(entry["y"]), width, height, mode,
+                                   parse_color(entry.get("color", "#000000")), tolerance, fraction))
+    return tuple(regions)
+
+def region_entry(region):
+    return {"x": region.x, "y": region.y, "width": region.width, "height": region.height, "mode": region.mode,
+            "color": format_color(region.color), "tolerance": region.tolerance, "fraction": region.fraction}
+
+# --- CAPTURE BACKENDS ---
+class CaptureBackend:
+    """ Source of screen pixels. grab() returns a (height, width, 3) uint8 RGB array of a screen rectangle.
+
+    grab() is only ever called from the watcher thread, so a backend that needs per-thread
+    state can create it on the first call.
+    """
+    name = None
+    def grab(self, x, y, width, height): raise NotImplementedError
+    def close(self): pass
+
+class SyntheticCapture(CaptureBackend):
+    """ A screen held in memory that tests and benchmarks paint on with fill(). """
+    name = "synthetic"
+
+    def __init__(self, width=1920, height=1080):
+        np = load_numpy()
+        self.screen = np.zeros((height, width, 3), np.uint8)
+        self.lock = threading.Lock()
+        self.grabs = 0
+
+    def fill(self, x, y, width, height, color):
+        with self.lock: self.screen[y:y + height, x:x + width] = color
+
+    def grab(self, x, y, width, height):
+        with self.lock:
+            self.grabs += 1
+            return self.screen[y:y + height, x:x + width].copy()
+
+class MssCapture(CaptureBackend):
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self.mss = mss.mss
+        self.np = load_numpy()
+        self.local = threading.local()
+
+    def grab(self, x, y, width, height):
+        sct = getattr(self.local, "sct", None)
+        if sct is None: sct = self.local.sct = self.mss()
+        shot = sct.grab({"left": x, "top": y, "width": width, "height": height})
+        # BGRA rows to an RGB view, without copying
+        return self.np.frombuffer(shot.bgra, self.np.uint8).reshape(shot.height, shot.width, 4)[:, :, 2::-1]
+
+class PillowCapture(CaptureBackend):
+    name = "pillow"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self.image_grab = ImageGrab.grab
+        self.np = load_numpy()
+
+    def grab(self, x, y, width, height):
+        return self.np.asarray(self.image_grab(bbox=(x, y, x + width, y + height), all_screens=True).convert("RGB"))
+
+CAPTURE_BACKENDS = {cls.name: cls for cls in (SyntheticCapture, MssCapture, PillowCapture)}
+
+def create_capture(name=None):
+    """ The named capture backend, or the first real one that loads here.
+
+    Raises ValueError for an unknown name and ImportError when nothing can capture the screen.
+    """
+    if load_numpy() is None: raise ImportError("Watching screen regions needs NumPy")
+    if name is not None:
+        if name not in CAPTURE_BACKENDS: raise ValueError(f"Unknown capture backend: {name!r}")
+        return CAPTURE_BACKENDS[name]()
+    for cls in (MssCapture, PillowCapture):
+        try:
+            return cls()
+        except ImportError:
+            pass
+    raise ImportError("No screen capture backend available; install mss or Pillow")
+
+# --- WATCHER ---
+class Watch:
+    """ One watched region of one key, placed in the tile grid of a WatchLayout. """
+    __slots__ = ("key", "region", "rows", "cols", "tile_rows", "tile_cols", "color", "reference", "matched")
+
+    def __init__(self, key, region, box, tile, np):
+        bx, by = box[:2]
+        x0, y0 = region.x - bx, region.y - by
+        self.key = key
+        self.region = region
+        self.rows = slice(y0, y0 + region.height); self.cols = slice(x0, x0 + region.width)
+        self.tile_rows = slice(y0 // tile, -(-(y0 + region.height) // tile))
+        self.tile_cols = slice(x0 // tile, -(-(x0 + region.width) // tile))
+        self.color = np.array(region.color, np.int16)
+        self.reference = None
+        self.matched = False
+
+class WatchLayout:
+    """ The regions being watched, the bounding box captured for them and two frame buffers.
+
+    Frames are copied into whichever buffer does not hold the previous frame. The buffers
+    are padded to whole tiles with pixels that never change, so tiles are compared with
+    plain reshapes and nothing is allocated per frame.
+    """
+    def __init__(self, regions, tile, np):
+        self.watches = ()
+        self.box = None
+        self.buffers = ()
+        self.turn = 0
+        self.primed = False
+        if not regions: return
+        x0 = min(r.x for _, r in regions); y0 = min(r.y for _, r in regions)
+        x1 = max(r.x + r.width for _, r in regions); y1 = max(r.y + r.height for _, r in regions)
+        self.box = (x0, y0, x1 - x0, y1 - y0)
+        shape = (-(-(y1 - y0) // tile) * tile, -(-(x1 - x0) // tile) * tile, 3)
+        self.buffers = (np.zeros(shape, np.uint8), np.zeros(shape, np.uint8))
+        self.watches = tuple(Watch(key, region, self.box, tile, np) for key, region in regions)
+
+class RegionWatcher:
+    """ Samples the watched regions at a fixed rate and reports when a key's regions start or stop matching.
+
+    Every frame is one grab of the bounding box of all regions. It is compared with the
+    previous frame in TILE-sized tiles with a single vectorized pass, and only the
+    regions overlapping a changed tile are evaluated again; the rest keep their last
+    result, so a static screen costs one grab and one comparison however many regions
+    are watched. on_change(key, matched) is called from the watcher thread when any
+    region of a key starts matching (True) or when none matches any more (False), so it
+    should only hand the event off.
+    """
+    def __init__(self, capture, on_change, fps=WATCH_FPS, tile=TILE):
+        self.np = load_numpy()
+        if self.np is None: raise ImportError("Watching screen regions needs NumPy")
+        self.capture = capture
+        self.on_change = on_change
+        self.tile = tile
+        self.period_ns = int(1e9 / fps)
+        self.layout = WatchLayout((), tile, self.np)
+        self.matched = {}
+        self.frames = 0
+        self.evaluations = 0
+        self.timings = DurationRing()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def set_regions(self, regions):
+        """ regions: iterable of (key, WatchRegion). Swapped in whole; safe to call while running. """
+        self.layout = WatchLayout(tuple(regions), self.tile, self.np)
+
+    def set_fps(self, fps):
+        self.period_ns = int(1e9 / fps)
+
+    def dirty_tiles(self, frame, prev):
+        """ Boolean grid with one cell per tile, True where anything in the tile changed. """
+        np, tile = self.np, self.tile
+        # Rows are compared as flat bytes, eight at a time when the widths allow it; reducing
+        # over the 3-wide channel axis instead is an order of magnitude slower.
+        h, w = frame.shape[:2]
+        a, b = frame.reshape(h, -1), prev.reshape(h, -1)
+        if tile * 3 % 8 == 0: a, b = a.view(np.uint64), b.view(np.uint64)
+        changed = (a != b).reshape(h // tile, tile, -1).any(axis=1)
+        return changed.reshape(h // tile, w // tile, -1).any(axis=2)
+
+    def evaluate(self, watch, frame):
+        """ Whether the region of `watch` matches in `frame`, as a plain bool for on_change. """
+        np, region = self.np, watch.region
+        pixels = frame[watch.rows, watch.cols].astype(np.int16)
+        if region.mode == "color":
+            close = np.abs(pixels - watch.color) <= region.tolerance
+            hits = close[..., 0] & close[..., 1] & close[..., 2]
+        else:
+            if watch.reference is None: watch.reference = pixels
+            moved = np.abs(pixels - watch.reference) > region.tolerance
+            hits = moved[..., 0] | moved[..., 1] | moved[..., 2]
+        return bool(np.count_nonzero(hits) >= region.fraction * hits.size)
+
+    def step(self):
+        """ Grab and evaluate one frame, then report keys whose state flipped. Returns the number of regions evaluated. """
+        start = time.perf_counter_ns()
+        layout = self.layout
+        evaluated = 0
+        if layout.box is not None:
+            grabbed = self.capture.grab(*layout.box)
+            frame, prev = layout.buffers[layout.turn], layout.buffers[1 - layout.turn]
+            frame[:grabbed.shape[0], :grabbed.shape[1]] = grabbed
+            dirty = self.dirty_tiles(frame, prev) if layout.primed else None
+            for watch in layout.watches:
+                if dirty is None or dirty[watch.tile_rows, watch.tile_cols].any():
+                    watch.matched = self.evaluate(watch, frame); evaluated += 1
+            layout.turn = 1 - layout.turn; layout.primed = True
+        states = {}
+        for watch in layout.watches: states[watch.key] = states.get(watch.key, False) or watch.matched
+        for key in set(self.matched) | set(states):
+            matched = states.get(key, False)
+            if matched != self.matched.get(key, False): self.on_change(key, matched)
+        self.matched = states
+        self.frames += 1; self.evaluations += evaluated
+        self.timings.record(time.perf_counter_ns() - start)
+        return evaluated
+
+    def run(self):
+        next_ns = time.perf_counter_ns()
+        while True:
+            try:
+                self.step()
+            except Exception as e:
+                print(f"Screen capture failed: {e}")
+            now = time.perf_counter_ns()
+            next_ns += self.period_ns
+            if next_ns < now: next_ns = now # Frames that took too long are dropped, not caught up
+            if self.stopping.wait((next_ns - now) / 1e9): break
+        # Nothing is watched any more, so every key that was matching is released
+        for key, matched in self.matched.items():
+            if matched: self.on_change(key, False)
+        self.matched = {}
+
+    def start(self):
+        if self.thread is not None: return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name="RegionWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None: return
+        self.stopping.set(); self.thread.join(1); self.thread = None
+
+    def snapshot(self):
+        """ Frames grabbed, regions evaluated and how long a frame took, in microseconds. """
+        timings = self.timings.snapshot()
+        return {"frames": self.frames, "evaluations": self.evaluations, "regions": len(self.layout.watches),
+                "p50_us": timings["p50_us"], "p99_us": timings["p99_us"], "max_us": timings["max_us"]}
@@ -1,27 +1,44 @@
 import sys
-import threading
 import time
-import json
-import random
 import os
-import math
-import winsound
+import importlib.util
+from functools import partial
 
-# Platform-specific imports
+# Platform-specific and optional modules (pywin32, pynput) are imported where
+# they are first used, so the window can show before they load and the app still starts
+# on platforms that lack them.
 CAN_USE_WIN32 = False
 if sys.platform == "win32":
-    try:
-        import win32api, win32con
-        CAN_USE_WIN32 = True
-    except ImportError:
+    CAN_USE_WIN32 = importlib.util.find_spec("win32api") is not None
+    if not CAN_USE_WIN32:
         print("Could not import pywin32. Win32 mouse control will be disabled.")
 
-from pynput import mouse, keyboard
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QCheckBox, QFrame, QListWidget, 
-                             QInputDialog, QMessageBox, QTabWidget, QSpinBox, QSystemTrayIcon, QMenu, QComboBox)
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
-from PyQt6.QtGui import QIcon, QAction
+                             QInputDialog, QMessageBox, QTabWidget, QSpinBox, QSystemTrayIcon, QMenu, QComboBox,
+                             QDoubleSpinBox, QFileDialog, QColorDialog)
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer, QRect
+from PyQt6.QtGui import QIcon, QAction, QColor, QCursor, QFont, QFontMetrics, QPainter
+
+from autoclicker.audio import AudioWorker
+from autoclicker.backends import BUTTONS, LINUX_BACKENDS, create_backend
+from autoclicker.config import ClickerConfig, DEFAULT_CLICKER_SETTINGS, DEFAULT_PREFS
+from autoclicker.cursor import CursorCache
+from autoclicker.engine import ClickEngine
+from autoclicker.hotkeys import ChordCapture, TriggerMap, chord_label, normalize_chord
+from autoclicker.macro import Macro, MacroPlayer, MacroRecorder, MappedMacro, STOP_KEY, read_macro_json, write_macro_json
+from autoclicker.movement import MOVE_MODES
+from autoclicker.profiles import ProfileStore
+from autoclicker.scheduler import MISSED_POLICIES, parse_clock_time, perf_ns_at
+from autoclicker.sequence import SequenceRun, parse_points
+from autoclicker.profiler import ThreadSampler, default_profile_path
+from autoclicker.tracing import default_trace_path
+from autoclicker.watcher import RegionWatcher, create_capture, format_color, parse_regions
+
+# The countdown label is recomputed from the start deadline this often
+COUNTDOWN_REFRESH_MS = 50
+# Time to move the cursor onto a target after clicking "Add Point" or "Pick at Cursor"
+POINT_CAPTURE_DELAY_MS = 3000
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -116,25 +133,10 @@ QMessageBox, QInputDialog {
 class Communicate(QObject):
     state_changed = pyqtSignal()
     update_key_text = pyqtSignal(str)
-    show_countdown = pyqtSignal(int)
-    hide_countdown = pyqtSignal()
-    countdown_finished = pyqtSignal()
-
-class CountdownWorker(QObject):
-    def __init__(self, seconds, comm):
-        super().__init__()
-        self.seconds = seconds
-        self.comm = comm
-        self.is_running = True
-
-    def run(self):
-        for i in range(self.seconds, 0, -1):
-            if not self.is_running: break
-            self.comm.show_countdown.emit(i)
-            time.sleep(1)
-        if self.is_running:
-            self.comm.hide_countdown.emit()
-            self.comm.countdown_finished.emit()
+    recording_stopped = pyqtSignal()
+    # Emitted from the keyboard hook thread, so the slots run queued on the GUI thread
+    trigger_pressed = pyqtSignal()
+    trigger_released = pyqtSignal()
 
 # --- CLICKER WIDGET --- 
 class ClickerWidget(QFrame):
@@ -146,13 +148,17 @@ class ClickerWidget(QFrame):
         self.main_window = main_window
         self.clicking = False
         self.trigger_key = None
-        self.countdown_worker = None
+        # perf_counter_ns() deadline of the first click when the start was delayed, else None
+        self.start_ns = None
+        self.run = None
+        self.sequence = [] # Points as stored in the profile
+        self.watch_regions = [] # Watched regions as stored in the profile
+        self.watch_color = "#ff0000"
 
         self.comm = Communicate()
         self.comm.state_changed.connect(self.update_gui_state)
-        self.comm.show_countdown.connect(self.main_window.show_countdown)
-        self.comm.hide_countdown.connect(self.main_window.hide_countdown)
-        self.comm.countdown_finished.connect(self.start_clicking_after_countdown)
+        self.comm.trigger_pressed.connect(self.handle_key_press)
+        self.comm.trigger_released.connect(self.handle_key_release)
 
         self.init_ui()
 
@@ -204,8 +210,120 @@ class ClickerWidget(QFrame):
         self.random_pos_layout.addWidget(self.radius_spinbox)
         self.radius_spinbox.hide()
         self.random_pos_check.toggled.connect(self.radius_spinbox.setVisible)
+        self.random_pos_check.toggled.connect(self.push_config)
+        self.radius_spinbox.valueChanged.connect(self.push_config)
         layout.addLayout(self.random_pos_layout)
 
+        self.move_mode_widget = QWidget()
+        move_mode_layout = QHBoxLayout(self.move_mode_widget)
+        move_mode_layout.setContentsMargins(0,0,0,0)
+        move_mode_layout.addWidget(QLabel("Movement:"))
+        self.move_mode_combo = QComboBox()
+        self.move_mode_combo.addItems(MOVE_MODES)
+        self.move_mode_combo.setToolTip("How the cursor travels to each randomized position. \"Teleport\" jumps there instantly.")
+        self.move_mode_combo.currentTextChanged.connect(self.push_config)
+        move_mode_layout.addWidget(self.move_mode_combo)
+        layout.addWidget(self.move_mode_widget)
+        self.move_mode_widget.hide()
+        self.random_pos_check.toggled.connect(self.update_move_mode_visibility)
+
+        self.sequence_check = QCheckBox("Click a Sequence of Points")
+        self.sequence_check.setToolTip("Click each point of the list in turn, in a loop, instead of at the cursor.")
+        self.sequence_check.toggled.connect(self.update_move_mode_visibility)
+        layout.addWidget(self.sequence_check)
+        self.sequence_widget = QWidget()
+        sequence_layout = QVBoxLayout(self.sequence_widget)
+        sequence_layout.setContentsMargins(0,0,0,0)
+        self.point_list = QListWidget()
+        self.point_list.setMaximumHeight(90)
+        sequence_layout.addWidget(self.point_list)
+        point_options_layout = QHBoxLayout()
+        self.point_button_combo = QComboBox()
+        self.point_button_combo.addItems(BUTTONS)
+        self.point_button_combo.setCurrentText(self.button)
+        point_options_layout.addWidget(self.point_button_combo)
+        self.hold_spinbox = QDoubleSpinBox()
+        self.hold_spinbox.setRange(0, 10); self.hold_spinbox.setDecimals(3); self.hold_spinbox.setSingleStep(0.01)
+        self.hold_spinbox.setSuffix(" s hold")
+        point_options_layout.addWidget(self.hold_spinbox)
+        self.dwell_spinbox = QDoubleSpinBox()
+        self.dwell_spinbox.setRange(0, 60); self.dwell_spinbox.setDecimals(3); self.dwell_spinbox.setSingleStep(0.05); self.dwell_spinbox.setValue(0.1)
+        self.dwell_spinbox.setSuffix(" s dwell")
+        point_options_layout.addWidget(self.dwell_spinbox)
+        sequence_layout.addLayout(point_options_layout)
+        point_button_layout = QHBoxLayout()
+        self.add_point_button = QPushButton("Add Point")
+        self.add_point_button.setToolTip(f"Adds the cursor position {POINT_CAPTURE_DELAY_MS // 1000} seconds after clicking, with the button, hold and dwell above.")
+        self.add_point_button.clicked.connect(self.add_point)
+        point_button_layout.addWidget(self.add_point_button)
+        remove_point_button = QPushButton("Remove"); remove_point_button.clicked.connect(self.remove_point)
+        point_button_layout.addWidget(remove_point_button)
+        clear_points_button = QPushButton("Clear"); clear_points_button.clicked.connect(self.clear_points)
+        point_button_layout.addWidget(clear_points_button)
+        sequence_layout.addLayout(point_button_layout)
+        self.optimize_check = QCheckBox("Optimize Order for Shortest Travel")
+        self.optimize_check.setToolTip("Reorder the points so the cursor travels as little as possible per loop. The first point stays first.")
+        self.optimize_check.toggled.connect(self.push_config)
+        sequence_layout.addWidget(self.optimize_check)
+        layout.addWidget(self.sequence_widget)
+        self.sequence_widget.hide()
+        self.sequence_check.toggled.connect(self.sequence_widget.setVisible)
+        self.sequence_check.toggled.connect(self.push_config)
+
+        self.watch_check = QCheckBox("Trigger on Screen Region")
+        self.watch_check.setToolTip("Act as if the trigger key were pressed while any region below matches, and released when none does.")
+        layout.addWidget(self.watch_check)
+        self.watch_widget = QWidget()
+        watch_layout = QVBoxLayout(self.watch_widget)
+        watch_layout.setContentsMargins(0,0,0,0)
+        self.region_list = QListWidget()
+        self.region_list.setMaximumHeight(70)
+        watch_layout.addWidget(self.region_list)
+        region_box_layout = QHBoxLayout()
+        self.region_spinboxes = []
+        for prefix, low, value in (("x ", 0, 0), ("y ", 0, 0), ("w ", 1, 10), ("h ", 1, 10)):
+            spinbox = QSpinBox(); spinbox.setRange(low, 16384); spinbox.setValue(value); spinbox.setPrefix(prefix)
+            region_box_layout.addWidget(spinbox); self.region_spinboxes.append(spinbox)
+        watch_layout.addLayout(region_box_layout)
+        region_match_layout = QHBoxLayout()
+        self.watch_mode_combo = QComboBox()
+        self.watch_mode_combo.addItems(["Color", "Change"])
+        self.watch_mode_combo.setToolTip("Color: match while the region has the color. Change: match while the region differs from how it looked when watching started.")
+        region_match_layout.addWidget(self.watch_mode_combo)
+        self.color_button = QPushButton()
+        self.color_button.clicked.connect(self.choose_watch_color)
+        region_match_layout.addWidget(self.color_button)
+        self.tolerance_spinbox = QSpinBox(); self.tolerance_spinbox.setRange(0, 255); self.tolerance_spinbox.setValue(16); self.tolerance_spinbox.setPrefix("± ")
+        self.tolerance_spinbox.setToolTip("How far each color channel may be off and still count.")
+        region_match_layout.addWidget(self.tolerance_spinbox)
+        self.fraction_spinbox = QSpinBox(); self.fraction_spinbox.setRange(1, 100); self.fraction_spinbox.setValue(50); self.fraction_spinbox.setSuffix(" %")
+        self.fraction_spinbox.setToolTip("Share of the region's pixels that has to match.")
+        region_match_layout.addWidget(self.fraction_spinbox)
+        watch_layout.addLayout(region_match_layout)
+        region_button_layout = QHBoxLayout()
+        self.pick_region_button = QPushButton("Pick at Cursor")
+        self.pick_region_button.setToolTip(f"Centers the region on the cursor {POINT_CAPTURE_DELAY_MS // 1000} seconds after clicking, and takes the color under it.")
+        self.pick_region_button.clicked.connect(self.pick_region)
+        region_button_layout.addWidget(self.pick_region_button)
+        add_region_button = QPushButton("Add"); add_region_button.clicked.connect(self.add_region)
+        region_button_layout.addWidget(add_region_button)
+        remove_region_button = QPushButton("Remove"); remove_region_button.clicked.connect(self.remove_region)
+        region_button_layout.addWidget(remove_region_button)
+        watch_layout.addLayout(region_button_layout)
+        layout.addWidget(self.watch_widget)
+        self.watch_widget.hide()
+        self.set_watch_color(self.watch_color)
+        self.watch_check.toggled.connect(self.watch_widget.setVisible)
+        self.watch_check.toggled.connect(self.main_window.rebuild_watcher)
+
+        seed_layout = QHBoxLayout()
+        seed_layout.addWidget(QLabel("Random Seed:"))
+        self.seed_entry = QLineEdit("")
+        self.seed_entry.setPlaceholderText("new each run")
+        self.seed_entry.setToolTip("Reuse a seed to replay the exact same random intervals and positions.")
+        seed_layout.addWidget(self.seed_entry)
+        layout.addLayout(seed_layout)
+
         self.clicks_entry = QLineEdit("0")
         layout.addWidget(QLabel("Clicks (0=inf):"))
         layout.addWidget(self.clicks_entry)
@@ -217,6 +335,14 @@ class ClickerWidget(QFrame):
         activation_layout.addWidget(self.activation_mode_combo)
         layout.addLayout(activation_layout)
 
+        missed_layout = QHBoxLayout()
+        missed_layout.addWidget(QLabel("Missed Clicks:"))
+        self.missed_policy_combo = QComboBox()
+        self.missed_policy_combo.addItems(MISSED_POLICIES)
+        self.missed_policy_combo.setToolTip("What to do with clicks that fell behind schedule: fire them immediately or drop them.")
+        missed_layout.addWidget(self.missed_policy_combo)
+        layout.addLayout(missed_layout)
+
         self.set_key_button = QPushButton("Set Trigger Key")
         self.set_key_button.clicked.connect(self.set_trigger_key)
         layout.addWidget(self.set_key_button)
@@ -228,14 +354,88 @@ class ClickerWidget(QFrame):
 
         self.comm.update_key_text.connect(self.set_key_button.setText)
 
+    def update_move_mode_visibility(self, *args):
+        self.move_mode_widget.setVisible(self.random_pos_check.isChecked() or self.sequence_check.isChecked())
+
+    # --- SEQUENCE ---
+    def refresh_point_list(self):
+        self.point_list.clear()
+        for i, p in enumerate(self.sequence, 1):
+            self.point_list.addItem(f"{i}. ({p['x']}, {p['y']}) {p['button']}, hold {p['hold']:g} s, dwell {p['dwell']:g} s")
+
+    def add_point(self):
+        self.add_point_button.setDisabled(True); self.add_point_button.setText("Move the cursor...")
+        QTimer.singleShot(POINT_CAPTURE_DELAY_MS, self.capture_point)
+
+    def capture_point(self):
+        x, y = self.cursor_position()
+        self.sequence.append({"x": int(x), "y": int(y), "button": self.point_button_combo.currentText(), "hold": self.hold_spinbox.value(), "dwell": self.dwell_spinbox.value()})
+        self.add_point_button.setDisabled(False); self.add_point_button.setText("Add Point")
+        self.refresh_point_list(); self.push_config()
+
+    def cursor_position(self):
+        # The input backend reports the coordinates clicks are sent to; Qt's may be scaled on HiDPI screens
+        try:
+            return self.main_window.create_input_backend(self.main_window.input_backend_name()).cursor_position()
+        except (ImportError, ValueError):
+            pos = QCursor.pos(); return pos.x(), pos.y()
+
+    def remove_point(self):
+        row = self.point_list.currentRow()
+        if row < 0: return
+        del self.sequence[row]; self.refresh_point_list(); self.push_config()
+
+    def clear_points(self):
+        self.sequence = []; self.refresh_point_list(); self.push_config()
+
+    # --- WATCHED REGIONS ---
+    def set_watch_color(self, color):
+        self.watch_color = color
+        self.color_button.setText(color); self.color_button.setStyleSheet(f"background-color: {color}; color: {'black' if QColor(color).lightness() > 127 else 'white'};")
+
+    def choose_watch_color(self):
+        color = QColorDialog.getColor(QColor(self.watch_color), self, "Region Color")
+        if color.isValid(): self.set_watch_color(color.name())
+
+    def refresh_region_list(self):
+        self.region_list.clear()
+        for i, r in enumerate(self.watch_regions, 1):
+            match = f"{r['color']} ± {r['tolerance']}" if r["mode"] == "color" else f"change > {r['tolerance']}"
+            self.region_list.addItem(f"{i}. {r['width']}x{r['height']} at ({r['x']}, {r['y']}), {match}, {r['fraction']:.0%}")
+
+    def pick_region(self):
+        self.pick_region_button.setDisabled(True); self.pick_region_button.setText("Move the cursor...")
+        QTimer.singleShot(POINT_CAPTURE_DELAY_MS, self.capture_region)
+
+    def capture_region(self):
+        x, y = (int(v) for v in self.cursor_position())
+        x_box, y_box, w_box, h_box = self.region_spinboxes
+        x_box.setValue(max(0, x - w_box.value() // 2)); y_box.setValue(max(0, y - h_box.value() // 2))
+        try:
+            self.set_watch_color(format_color(create_capture().grab(x, y, 1, 1)[0, 0]))
+        except Exception as e:
+            # Without a working capture backend (mss raises its own ScreenShotError) Qt can still read the pixel; on scaled screens it may be a neighbour
+            print(f"Reading the color through Qt ({e})")
+            self.set_watch_color(QApplication.primaryScreen().grabWindow(0, x, y, 1, 1).toImage().pixelColor(0, 0).name())
+        self.pick_region_button.setDisabled(False); self.pick_region_button.setText("Pick at Cursor")
+
+    def add_region(self):
+        x, y, width, height = (box.value() for box in self.region_spinboxes)
+        self.watch_regions.append({"x": x, "y": y, "width": width, "height": height, "mode": self.watch_mode_combo.currentText().lower(),
+                                   "color": self.watch_color, "tolerance": self.tolerance_spinbox.value(), "fraction": self.fraction_spinbox.value() / 100})
+        self.refresh_region_list(); self.main_window.rebuild_watcher()
+
+    def remove_region(self):
+        row = self.region_list.currentRow()
+        if row < 0: return
+        del self.watch_regions[row]; self.refresh_region_list(); self.main_window.rebuild_watcher()
+
     def toggle_interval_widgets(self, checked):
         self.fixed_interval_widget.setVisible(not checked)
         self.random_interval_widget.setVisible(checked)
 
     def get_trigger_key_str(self):
-        if not self.trigger_key: return "Not Set"
-        try: return f"'{self.trigger_key.char}'"
-        except AttributeError: return str(self.trigger_key).replace("Key.", "")
+        return chord_label(self.trigger_key)
 
     def on_enable_toggled(self, checked):
         if checked:
@@ -244,50 +444,59 @@ class ClickerWidget(QFrame):
         else:
             self.enable_button.setText("Disabled")
             self.enable_button.setStyleSheet("background-color: #4A4A4A;")
+        self.main_window.rebuild_watcher()
 
     def set_trigger_key(self):
         self.set_key_button.setText("Press a key...")
         self.set_key_button.setDisabled(True)
-        listener = keyboard.Listener(on_press=self.on_key_press_capture)
+        from pynput import keyboard
+        capture = ChordCapture(self.on_trigger_captured)
+        listener = keyboard.Listener(on_press=capture.on_press, on_release=capture.on_release)
         listener.start()
 
-    def on_key_press_capture(self, key):
-        self.trigger_key = key
+    def on_trigger_captured(self, chord):
+        self.trigger_key = chord
+        self.main_window.rebuild_triggers()
         self.comm.update_key_text.emit(f"Trigger: {self.get_trigger_key_str()}")
         self.set_key_button.setDisabled(False)
-        return False
 
-    def start_clicking_after_countdown(self):
+    def start_clicking(self, start_ns=None):
+        """ Start now, at perf_counter_ns() value `start_ns`, or after the countdown if it is enabled.
+
+        A delayed start is handed to the engine straight away as a job whose first click
+        is at the deadline; the countdown on screen is only derived from it.
+        """
+        if self.clicking: return
+        if start_ns is None and self.main_window.prefs["countdown_enabled"]:
+            start_ns = self.main_window.countdown_deadline(self)
+        self.start_ns = start_ns
         self.clicking = True
         self.update_gui_state()
 
-    def start_clicking(self):
-        if self.clicking or (self.countdown_worker and self.countdown_worker.is_running):
-            return
-
-        if self.main_window.prefs["countdown_enabled"].isChecked():
-            seconds = self.main_window.prefs["countdown_seconds"].value()
-            self.countdown_worker = CountdownWorker(seconds, self.comm)
-            threading.Thread(target=self.countdown_worker.run, daemon=True).start()
-        else:
-            self.clicking = True
-            self.update_gui_state()
-
     def stop_clicking(self):
-        if not self.clicking and not (self.countdown_worker and self.countdown_worker.is_running):
-            return
-
-        if self.countdown_worker:
-            self.countdown_worker.is_running = False
+        # Also cancels a start that is still counting down
+        if not self.clicking: return
         self.clicking = False
+        self.start_ns = None
         self.update_gui_state()
 
+    def is_pending(self, now_ns=None):
+        """ Whether this clicker has been started but its first click is still ahead. """
+        return self.clicking and self.start_ns is not None and self.start_ns > (time.perf_counter_ns() if now_ns is None else now_ns)
+
+    def show_status(self):
+        if not self.clicking: text, color = "Stopped", "red"
+        elif self.is_pending(): text, color = "Starting...", "orange"
+        else: text, color = "Running", "#4CAF50"
+        if self.status_label.text() != f"Status: {text}":
+            self.status_label.setText(f"Status: {text}"); self.status_label.setStyleSheet(f"font-style: italic; color: {color};")
+
     def handle_key_press(self):
         if not self.enable_button.isChecked(): return
 
         mode = self.activation_mode_combo.currentText()
         if mode == "Toggle":
-            if self.clicking or (self.countdown_worker and self.countdown_worker.is_running):
+            if self.clicking:
                 self.stop_clicking()
             else:
                 self.start_clicking()
@@ -302,76 +511,312 @@ class ClickerWidget(QFrame):
             self.stop_clicking()
 
     def update_gui_state(self):
-        if self.main_window.prefs["sounds_enabled"].isChecked():
-            sound_thread = threading.Thread(target=lambda: winsound.MessageBeep(winsound.MB_OK if self.clicking else winsound.MB_ICONASTERISK), daemon=True)
-            sound_thread.start()
+        if self.clicking and not self.start_run():
+            self.clicking = False
+            self.status_label.setText("Status: Invalid input"); self.status_label.setStyleSheet("font-style: italic; color: red;")
+            return
+        if not self.clicking:
+            self.main_window.engine.stop_job(self)
+
+        if self.main_window.prefs["sounds_enabled"]:
+            self.main_window.audio.play("start" if self.clicking else "stop")
         
         self.main_window.update_on_screen_display()
-        if self.clicking:
-            self.status_label.setText("Status: Running")
-            self.status_label.setStyleSheet("font-style: italic; color: #4CAF50;")
-            click_thread = threading.Thread(target=self.click_worker, daemon=True)
-            click_thread.start()
-        else:
-            self.status_label.setText("Status: Stopped")
-            self.status_label.setStyleSheet("font-style: italic; color: red;")
-
-    def click_worker(self):
+        self.main_window.refresh_countdown()
+        self.show_status()
+
+    def get_settings(self):
+        return {
+            "enabled": self.enable_button.isChecked(),
+            "trigger_key": self.trigger_key,
+            "is_random": self.random_interval_check.isChecked(),
+            "interval": self.interval_entry.text(),
+            "min_interval": self.min_interval_entry.text(),
+            "max_interval": self.max_interval_entry.text(),
+            "num_clicks": self.clicks_entry.text(),
+            "activation_mode": self.activation_mode_combo.currentText(),
+            "randomize_pos": self.random_pos_check.isChecked(),
+            "randomize_radius": self.radius_spinbox.value(),
+            "missed_policy": self.missed_policy_combo.currentText(),
+            "random_seed": self.seed_entry.text(),
+            "move_mode": self.move_mode_combo.currentText(),
+            "sequence_enabled": self.sequence_check.isChecked(),
+            "sequence": [dict(p) for p in self.sequence],
+            "optimize_order": self.optimize_check.isChecked(),
+            "watch_enabled": self.watch_check.isChecked(),
+            "watch_regions": [dict(r) for r in self.watch_regions]
+        }
+
+    def build_config(self):
+        """ Snapshot the widgets into a ClickerConfig. Must run on the GUI thread; raises ValueError. """
+        return ClickerConfig.from_settings(self.get_settings(), self.button, self.main_window.input_backend_name())
+
+    def start_run(self):
+        """ Hand this clicker to the shared engine. Returns False if the settings are invalid. """
         try:
-            num_clicks = int(self.clicks_entry.text())
-            is_random = self.random_interval_check.isChecked()
-            if is_random:
-                min_delay = float(self.min_interval_entry.text())
-                max_delay = float(self.max_interval_entry.text())
-            else:
-                interval = float(self.interval_entry.text())
+            config = self.build_config()
+            backend = self.main_window.create_input_backend(config.backend)
+        except (ValueError, ImportError):
+            return False
+        self.run = self.main_window.engine.start_clicker(self, config, backend, self.on_run_finished, self.start_ns)
+        self.status_label.setToolTip(f"Random seed: {self.run.seed}")
+        return True
+
+    def push_config(self, *args):
+        # Live edits reach a running clicker only as a whole new config; invalid edits are ignored.
+        if not (self.clicking and self.run): return
+        try:
+            config = self.build_config()
         except ValueError:
-            self.status_label.setText("Status: Invalid input"); self.clicking = False; return
-
-        clicks_done = 0
-        use_win32 = self.main_window.prefs.get("use_win32_input") and self.main_window.prefs["use_win32_input"].isChecked()
-
-        while self.clicking:
-            if 0 < num_clicks <= clicks_done: break
-            
-            if self.random_pos_check.isChecked():
-                radius = self.radius_spinbox.value()
-                center_pos = self.main_window.mouse_controller.position
-                angle = random.uniform(0, 2 * math.pi)
-                dist = random.uniform(0, radius)
-                new_x = int(center_pos[0] + dist * math.cos(angle))
-                new_y = int(center_pos[1] + dist * math.sin(angle))
-                
-                if use_win32:
-                    self.main_window.smooth_move_win32(new_x, new_y)
-                else:
-                    self.main_window.smooth_move(new_x, new_y)
-
-            if use_win32:
-                self.main_window.click_win32(self.button)
-            else:
-                self.main_window.mouse_controller.click(self.button)
-
-            clicks_done += 1
-            delay = random.uniform(min_delay, max_delay) if is_random else interval
-            time.sleep(delay)
-        
+            return
+        if bool(config.sequence) == isinstance(self.run, SequenceRun):
+            self.run.swap_config(config); return
+        # Turning sequence mode on or off needs the other kind of run; the replaced one releases what it holds
+        self.run = self.main_window.engine.start_clicker(self, config, self.run.backend, self.on_run_finished, self.start_ns)
+        self.status_label.setToolTip(f"Random seed: {self.run.seed}")
+
+    def on_run_finished(self):
+        # Called from the engine thread once the click limit is reached
         if self.clicking:
             self.clicking = False
             self.comm.state_changed.emit()
 
+# --- MACRO PANEL ---
+class MacroPanel(QFrame):
+    def __init__(self, main_window):
+        super().__init__()
+        self.setObjectName("clickerFrame")
+        self.main_window = main_window
+        self.macros = {}
+        self.macro_files = {}
+        self.recorder = None
+        self.recording_name = None
+        self.playing = False
+
+        self.comm = Communicate()
+        self.comm.recording_stopped.connect(self.on_recording_stopped)
+        self.comm.state_changed.connect(self.on_playback_finished)
+
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        title_label = QLabel("Macros")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("font-size: 14pt; font-weight: bold;")
+        layout.addWidget(title_label)
+
+        self.macro_list = QListWidget()
+        layout.addWidget(self.macro_list)
+
+        button_layout = QHBoxLayout()
+        self.record_button = QPushButton("Record"); self.record_button.clicked.connect(self.start_recording)
+        button_layout.addWidget(self.record_button)
+        self.play_button = QPushButton("Play"); self.play_button.clicked.connect(self.toggle_playback)
+        button_layout.addWidget(self.play_button)
+        delete_button = QPushButton("Delete"); delete_button.clicked.connect(self.delete_macro)
+        button_layout.addWidget(delete_button)
+        layout.addLayout(button_layout)
+
+        file_button_layout = QHBoxLayout()
+        import_button = QPushButton("Import..."); import_button.clicked.connect(self.import_macro)
+        file_button_layout.addWidget(import_button)
+        export_button = QPushButton("Export..."); export_button.clicked.connect(self.export_macro)
+        file_button_layout.addWidget(export_button)
+        layout.addLayout(file_button_layout)
+
+        playback_layout = QHBoxLayout()
+        playback_layout.addWidget(QLabel("Speed:"))
+        self.speed_spinbox = QDoubleSpinBox(); self.speed_spinbox.setRange(0.1, 10.0); self.speed_spinbox.setSingleStep(0.25); self.speed_spinbox.setValue(1.0); self.speed_spinbox.setSuffix("x")
+        playback_layout.addWidget(self.speed_spinbox)
+        playback_layout.addWidget(QLabel("Repeat (0=inf):"))
+        self.repeat_spinbox = QSpinBox(); self.repeat_spinbox.setRange(0, 100000); self.repeat_spinbox.setValue(1)
+        playback_layout.addWidget(self.repeat_spinbox)
+        layout.addLayout(playback_layout)
+
+        self.status_label = QLabel("Status: Idle")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setStyleSheet("font-style: italic; color: grey;")
+        layout.addWidget(self.status_label)
+
+    def set_status(self, text, color="grey"):
+        self.status_label.setText(f"Status: {text}"); self.status_label.setStyleSheet(f"font-style: italic; color: {color};")
+
+    def refresh_list(self):
+        self.macro_list.clear()
+        for name, macro in self.macros.items():
+            self.macro_list.addItem(f"{name} ({len(macro)} events, {macro.duration_ns / 1e9:.1f}s)")
+
+    def selected_name(self):
+        row = self.macro_list.currentRow()
+        return list(self.macros)[row] if 0 <= row < len(self.macros) else None
+
+    def start_recording(self):
+        if self.recorder and self.recorder.recording: return
+        name, ok = QInputDialog.getText(self, "Record Macro", f"Macro name (press {STOP_KEY.upper()} to stop recording):")
+        if not (ok and name): return
+        self.recording_name = name
+        self.recorder = MacroRecorder(on_stopped=lambda macro: self.comm.recording_stopped.emit())
+        try:
+            self.recorder.start()
+        except ImportError:
+            self.set_status("Input unavailable", "red"); return
+        self.record_button.setDisabled(True)
+        self.set_status(f"Recording... press {STOP_KEY.upper()} to stop", "#4CAF50")
+
+    def on_recording_stopped(self):
+        macro = self.recorder.macro
+        self.record_button.setDisabled(False)
+        if len(macro) == 0:
+            self.set_status("Nothing recorded"); return
+        self.add_macro(self.recording_name, macro)
+        self.set_status(f"Recorded {len(macro)} events ({macro.nbytes() / 1024:.1f} KiB)")
+
+    def add_macro(self, name, macro):
+        self.macros[name] = macro
+        file_name = self.macro_files.pop(name, None)
+        if file_name: self.main_window.profile_store.discard_macro(file_name)
+        try:
+            self.macro_files[name] = self.main_window.profile_store.save_macro(macro)
+        except OSError as e:
+            print(f"Could not save macro '{name}': {e}") # Retried when the profile is saved
+        self.refresh_list(); self.macro_list.setCurrentRow(list(self.macros).index(name))
+
+    def import_macro(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Macro", "", "Macro JSON (*.json);;Macro files (*.acm)")
+        if not path: return
+        try:
+            macro = MappedMacro(path).to_macro() if path.endswith(".acm") else read_macro_json(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            QMessageBox.warning(self, "Import Failed", f"Could not import {path}: {e}"); return
+        self.add_macro(os.path.splitext(os.path.basename(path))[0], macro)
+
+    def export_macro(self):
+        name = self.selected_name()
+        if name is None: return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Macro", f"{name}.json", "Macro JSON (*.json)")
+        if not path: return
+        try:
+            write_macro_json(self.macros[name], path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not export to {path}: {e}")
+
+    def toggle_playback(self):
+        if self.playing:
+            self.main_window.engine.stop_job(self); self.on_playback_finished(); return
+        name = self.selected_name()
+        if name is None: return
+        try:
+            backend = self.main_window.create_input_backend(self.main_window.input_backend_name())
+            player = MacroPlayer(self.macros[name], backend, self.speed_spinbox.value(), self.repeat_spinbox.value())
+        except (ValueError, ImportError) as e:
+            self.set_status(f"Cannot play: {e}", "red"); return
+        self.main_window.engine.start_job(self, player, on_finished=self.comm.state_changed.emit)
+        self.playing = True
+        self.play_button.setText("Stop")
+        self.set_status(f"Playing '{name}'", "#4CAF50")
+
+    def on_playback_finished(self):
+        if not self.playing: return
+        self.playing = False
+        self.play_button.setText("Play")
+        self.set_status("Stopped", "red")
+
+    def delete_macro(self):
+        name = self.selected_name()
+        if name is None: return
+        if QMessageBox.question(self, "Delete Macro", f"Are you sure you want to delete '{name}'?") == QMessageBox.StandardButton.Yes:
+            del self.macros[name]; self.refresh_list()
+            file_name = self.macro_files.pop(name, None)
+            if file_name: self.main_window.profile_store.discard_macro(file_name)
+
+    def get_settings(self):
+        store = self.main_window.profile_store
+        settings = {}
+        for name, macro in self.macros.items():
+            if name not in self.macro_files:
+                try:
+                    self.macro_files[name] = store.save_macro(macro)
+                except OSError as e:
+                    # Kept inline in the profile instead; writing the file is retried on the next save
+                    print(f"Could not save macro '{name}': {e}")
+                    settings[name] = macro.to_dict(); continue
+            settings[name] = {"file": self.macro_files[name]}
+        return settings
+
+    def load_settings(self, settings):
+        # Runs when a profile is selected: macro files are only mapped, never read in full
+        store = self.main_window.profile_store
+        self.macros = {}; self.macro_files = {}
+        for name, data in settings.items():
+            try:
+                if "file" in data:
+                    self.macros[name] = store.open_macro(data["file"]); self.macro_files[name] = data["file"]
+                else:
+                    self.macros[name] = Macro.from_dict(data) # Inline macro from an older profile
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Skipping macro '{name}': {e}")
+        self.refresh_list()
+
+# --- STATUS OVERLAY ---
+class StatusOverlay(QWidget):
+    """ Always-on-top status window with a fixed size and position.
+
+    Rows are painted straight from cached strings. set_rows() repaints only when the text
+    changed and never resizes or moves the window, so a refresh costs at most one paint
+    and no layout pass.
+    """
+    MAX_ROWS = 3
+    # Sized once for the widest row it is expected to show; longer rows are elided
+    WIDTH_TEMPLATE = "Right ON (ctrl+shift+f12) | 9999999 clicks | 9999.9 CPS | p95 99.99 ms | missed 9999"
+    PADDING = 4
+    def __init__(self):
+        super().__init__()
+        self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground); self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        font = QFont(self.font()); font.setBold(True); self.setFont(font)
+        self.metrics = QFontMetrics(font)
+        self.row_height = self.metrics.height() + 2 * self.PADDING
+        self.setFixedSize(self.metrics.horizontalAdvance(self.WIDTH_TEMPLATE) + 2 * self.PADDING, self.row_height * self.MAX_ROWS)
+        self.move(10, 10)
+        self.rows = ()
+        self.text_color = QColor("white")
+
+    def set_rows(self, rows):
+        """ rows: tuple of (text, background QColor), top to bottom. """
+        if rows == self.rows: return
+        self.rows = rows; self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        for i, (text, background) in enumerate(self.rows[:self.MAX_ROWS]):
+            text = self.metrics.elidedText(text, Qt.TextElideMode.ElideRight, self.width() - 2 * self.PADDING)
+            rect = QRect(0, i * self.row_height, self.metrics.horizontalAdvance(text) + 2 * self.PADDING, self.row_height - 2)
+            painter.fillRect(rect, background)
+            painter.setPen(self.text_color)
+            painter.drawText(rect.adjusted(self.PADDING, 0, 0, 0), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.end()
+
 # --- MAIN WINDOW --- 
 class AutoClickerProQT(QWidget):
     def __init__(self):
         super().__init__()
         self.setObjectName("mainWindow")
-        self.mouse_controller = mouse.Controller()
-        self.profiles = {}
-        self.profile_file = "profiles.json"
-        self.prefs = {}
+        self.input_backends = {}
+        self.cursor = CursorCache()
+        self.watcher = None
+        self.engine = ClickEngine()
+        self.sampler = ThreadSampler()
+        self.triggers = TriggerMap()
+        self.audio = AudioWorker()
+        self.profile_store = ProfileStore()
+        self.prefs = dict(DEFAULT_PREFS)
+        self.pref_widgets = {}
+        self.lazy_tabs = {}
         self.init_ui()
-        self.init_listeners()
         self.load_profiles()
+        # pynput takes a while to import; start listening once the window is up.
+        QTimer.singleShot(0, self.init_listeners)
 
     def init_ui(self):
         self.setWindowTitle("Autoclicker")
@@ -395,7 +840,9 @@ class AutoClickerProQT(QWidget):
         
         tray_menu = QMenu(); show_action = QAction("Show", self); quit_action = QAction("Quit", self)
         show_action.triggered.connect(self.show); quit_action.triggered.connect(self.quit_app)
-        tray_menu.addAction(show_action); tray_menu.addAction(quit_action)
+        self.trace_action = QAction("Start Tracing", self); self.trace_action.triggered.connect(self.toggle_trace)
+        self.profile_action = QAction("Start Profiling", self); self.profile_action.triggered.connect(self.toggle_profiler)
+        tray_menu.addAction(show_action); tray_menu.addAction(self.trace_action); tray_menu.addAction(self.profile_action); tray_menu.addAction(quit_action)
         self.tray_icon.setContextMenu(tray_menu)
         self.tray_icon.show()
 
@@ -418,52 +865,123 @@ class AutoClickerProQT(QWidget):
         main_layout.addWidget(profile_panel)
 
         # Tabs
-        tabs = QTabWidget()
+        self.tabs = tabs = QTabWidget()
         main_layout.addWidget(tabs)
 
         # Clickers Tab
         clickers_tab = QWidget()
         right_layout = QVBoxLayout(clickers_tab)
         clickers_layout = QHBoxLayout()
-        self.left_frame = ClickerWidget("Left Clicker", mouse.Button.left, self)
+        self.left_frame = ClickerWidget("Left Clicker", "left", self)
         clickers_layout.addWidget(self.left_frame)
         line = QFrame(); line.setFrameShape(QFrame.Shape.VLine); line.setFrameShadow(QFrame.Shadow.Sunken)
         clickers_layout.addWidget(line)
-        self.right_frame = ClickerWidget("Right Clicker", mouse.Button.right, self)
+        self.right_frame = ClickerWidget("Right Clicker", "right", self)
         clickers_layout.addWidget(self.right_frame)
         right_layout.addLayout(clickers_layout)
+        schedule_layout = QHBoxLayout()
+        schedule_layout.addWidget(QLabel("Start enabled clickers together at"))
+        self.start_time_entry = QLineEdit(); self.start_time_entry.setPlaceholderText("HH:MM:SS.mmm")
+        self.start_time_entry.returnPressed.connect(self.schedule_start)
+        schedule_layout.addWidget(self.start_time_entry)
+        schedule_button = QPushButton("Schedule"); schedule_button.clicked.connect(self.schedule_start)
+        schedule_layout.addWidget(schedule_button)
+        right_layout.addLayout(schedule_layout)
         tabs.addTab(clickers_tab, "Clickers")
 
-        # Preferences Tab
-        prefs_tab = QWidget()
-        prefs_layout = QVBoxLayout(prefs_tab)
-        self.prefs["show_notification"] = QCheckBox("Show On-Screen Notification"); self.prefs["show_notification"].setChecked(True)
-        prefs_layout.addWidget(self.prefs["show_notification"], alignment=Qt.AlignmentFlag.AlignLeft)
-        self.prefs["sounds_enabled"] = QCheckBox("Enable Start/Stop Sounds"); self.prefs["sounds_enabled"].setChecked(True)
-        prefs_layout.addWidget(self.prefs["sounds_enabled"], alignment=Qt.AlignmentFlag.AlignLeft)
+        # Macros Tab
+        self.macro_panel = MacroPanel(self)
+        tabs.addTab(self.macro_panel, "Macros")
+
+        # Preferences and Instructions are only built the first time they are shown
+        self.add_lazy_tab("Preferences", self.build_prefs_tab)
+        self.add_lazy_tab("Instructions", self.build_instructions_tab)
+        tabs.currentChanged.connect(self.build_lazy_tab)
+
+        # Status & Countdown Windows
+        self.status_window = StatusOverlay()
+        self.clicker_row_color = QColor("red"); self.info_row_color = QColor(0, 0, 0, 160)
+        # The overlay is refreshed from engine snapshots at most overlay_fps times a second, never per click
+        self.overlay_timer = QTimer(self); self.overlay_timer.timeout.connect(self.refresh_overlay)
+        self.countdown_timer = QTimer(self); self.countdown_timer.setInterval(COUNTDOWN_REFRESH_MS); self.countdown_timer.timeout.connect(self.refresh_countdown)
+        self.countdown_label = QLabel(""); self.countdown_label.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool); self.countdown_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground); self.countdown_label.setStyleSheet("background-color: rgba(0,0,0,180); color: white; font-weight: bold; font-size: 48pt; padding: 20px; border-radius: 10px;")
+
+    def add_lazy_tab(self, title, builder):
+        page = QWidget(); QVBoxLayout(page)
+        self.lazy_tabs[self.tabs.addTab(page, title)] = builder
+
+    def build_lazy_tab(self, index):
+        builder = self.lazy_tabs.pop(index, None)
+        if builder: builder(self.tabs.widget(index).layout())
+
+    def add_pref_checkbox(self, layout, key, text, tooltip=None):
+        box = QCheckBox(text); box.setChecked(self.prefs[key])
+        if tooltip: box.setToolTip(tooltip)
+        box.toggled.connect(partial(self.set_pref, key))
+        self.pref_widgets[key] = box
+        layout.addWidget(box, alignment=Qt.AlignmentFlag.AlignLeft)
+        return box
+
+    def set_pref(self, key, value):
+        self.prefs[key] = value
+        if key == "overlay_fps" and self.overlay_timer.isActive(): self.overlay_timer.setInterval(1000 // value)
+        if key == "watch_fps" and self.watcher: self.watcher.set_fps(value)
+        if key == "show_notification": self.update_on_screen_display()
+
+    def build_prefs_tab(self, prefs_layout):
+        self.add_pref_checkbox(prefs_layout, "show_notification", "Show On-Screen Notification")
+        self.add_pref_checkbox(prefs_layout, "sounds_enabled", "Enable Start/Stop Sounds")
         
         countdown_layout = QHBoxLayout()
-        self.prefs["countdown_enabled"] = QCheckBox("Enable Start Countdown"); self.prefs["countdown_enabled"].setChecked(False)
-        countdown_layout.addWidget(self.prefs["countdown_enabled"])
-        self.prefs["countdown_seconds"] = QSpinBox(); self.prefs["countdown_seconds"].setRange(1, 60); self.prefs["countdown_seconds"].setValue(3)
-        countdown_layout.addWidget(self.prefs["countdown_seconds"])
+        self.add_pref_checkbox(countdown_layout, "countdown_enabled", "Enable Start Countdown")
+        countdown_spinbox = QSpinBox(); countdown_spinbox.setRange(1, 60); countdown_spinbox.setValue(self.prefs["countdown_seconds"])
+        countdown_spinbox.valueChanged.connect(partial(self.set_pref, "countdown_seconds"))
+        self.pref_widgets["countdown_seconds"] = countdown_spinbox
+        countdown_layout.addWidget(countdown_spinbox)
         countdown_layout.addWidget(QLabel("seconds"))
         prefs_layout.addLayout(countdown_layout)
 
-        self.prefs["ask_on_close"] = QCheckBox("Ask what to do when closing window"); self.prefs["ask_on_close"].setChecked(True)
-        prefs_layout.addWidget(self.prefs["ask_on_close"], alignment=Qt.AlignmentFlag.AlignLeft)
+        overlay_layout = QHBoxLayout()
+        overlay_layout.addWidget(QLabel("Refresh on-screen notification"))
+        overlay_fps_spinbox = QSpinBox(); overlay_fps_spinbox.setRange(1, 60); overlay_fps_spinbox.setValue(self.prefs["overlay_fps"])
+        overlay_fps_spinbox.valueChanged.connect(partial(self.set_pref, "overlay_fps"))
+        self.pref_widgets["overlay_fps"] = overlay_fps_spinbox
+        overlay_layout.addWidget(overlay_fps_spinbox)
+        overlay_layout.addWidget(QLabel("times a second")); overlay_layout.addStretch()
+        prefs_layout.addLayout(overlay_layout)
+
+        watch_layout = QHBoxLayout()
+        watch_layout.addWidget(QLabel("Check watched screen regions"))
+        watch_fps_spinbox = QSpinBox(); watch_fps_spinbox.setRange(1, 120); watch_fps_spinbox.setValue(self.prefs["watch_fps"])
+        watch_fps_spinbox.valueChanged.connect(partial(self.set_pref, "watch_fps"))
+        self.pref_widgets["watch_fps"] = watch_fps_spinbox
+        watch_layout.addWidget(watch_fps_spinbox)
+        watch_layout.addWidget(QLabel("times a second")); watch_layout.addStretch()
+        prefs_layout.addLayout(watch_layout)
+
+        self.add_pref_checkbox(prefs_layout, "ask_on_close", "Ask what to do when closing window")
 
         if CAN_USE_WIN32:
-            self.prefs["use_win32_input"] = QCheckBox("Use Windows-native mouse control (Experimental)")
-            self.prefs["use_win32_input"].setToolTip("May work better for games that ignore standard inputs.")
-            prefs_layout.addWidget(self.prefs["use_win32_input"], alignment=Qt.AlignmentFlag.AlignLeft)
+            self.add_pref_checkbox(prefs_layout, "use_win32_input", "Use Windows-native mouse control (Experimental)", "May work better for games that ignore standard inputs.")
+        if sys.platform.startswith("linux"):
+            linux_input_layout = QHBoxLayout()
+            linux_input_layout.addWidget(QLabel("Mouse input through"))
+            linux_input_combo = QComboBox(); linux_input_combo.addItems(LINUX_BACKENDS); linux_input_combo.setCurrentText(self.prefs["linux_input"])
+            linux_input_combo.setToolTip("xtest sends X11 input directly and batches it, for high click rates. uinput creates a virtual mouse that also works on Wayland; it needs write access to /dev/uinput.")
+            linux_input_combo.currentTextChanged.connect(partial(self.set_pref, "linux_input"))
+            self.pref_widgets["linux_input"] = linux_input_combo
+            linux_input_layout.addWidget(linux_input_combo); linux_input_layout.addStretch()
+            prefs_layout.addLayout(linux_input_layout)
 
         prefs_layout.addStretch()
-        tabs.addTab(prefs_tab, "Preferences")
 
-        # Instructions Tab
-        instructions_tab = QWidget()
-        instructions_layout = QVBoxLayout(instructions_tab)
+    def sync_pref_widgets(self):
+        for key, w in self.pref_widgets.items():
+            if isinstance(w, QCheckBox): w.setChecked(self.prefs[key])
+            if isinstance(w, QSpinBox): w.setValue(self.prefs[key])
+            if isinstance(w, QComboBox): w.setCurrentText(self.prefs[key])
+
+    def build_instructions_tab(self, instructions_layout):
         instructions_text = '''
         <b>Instructions</b>
         <p>This autoclicker was created by yankivare cehovar.</p>
@@ -472,19 +990,24 @@ class AutoClickerProQT(QWidget):
         <b>How to Use:</b>
         <ol>
             <li><b>Enable:</b> First, enable the left or right clicker using the "Enabled/Disabled" button.</li>
-            <li><b>Set Trigger Key:</b> Click "Set Trigger Key" and press any key on your keyboard to assign it.</li>
+            <li><b>Set Trigger Key:</b> Click "Set Trigger Key" and press any key on your keyboard to assign it. Hold Ctrl, Alt or Shift first for a combination such as Ctrl+Shift+F6.</li>
             <li><b>Interval:</b> Set a fixed or random interval in seconds.</li>
-            <li><b>Position Randomization:</b> Optionally, have the clicker click in a random radius around your cursor.</li>
+            <li><b>Position Randomization:</b> Optionally, have the clicker click in a random radius around your cursor. "Movement" picks how the cursor travels there.</li>
+            <li><b>Screen Regions:</b> Check "Trigger on Screen Region" to have a region of the screen press the trigger for you: while a region has the chosen color (or has changed, in "Change" mode) it acts like the trigger key held down. With "Press" activation the clicker runs exactly while a region matches.</li>
+            <li><b>Sequences:</b> Check "Click a Sequence of Points" and use "Add Point" to add the cursor position after 3 seconds. The points are clicked in a loop; "Optimize Order" reorders them for the shortest cursor travel.</li>
             <li><b>Number of Clicks:</b> Set the number of clicks to perform. Use <code>0</code> for infinite.</li>
             <li><b>Activation Mode:</b> Choose "Toggle" (press key to start/stop) or "Press" (clicks while key is held).</li>
+            <li><b>Missed Clicks:</b> If a click falls behind schedule, "Catch Up" fires it right away and "Skip" drops it.</li>
             <li><b>Start/Stop:</b> Use the assigned trigger key.</li>
             <li><b>Profiles:</b> Save and load your settings on the left panel.</li>
+            <li><b>Macros:</b> Record mouse and keyboard input in the "Macros" tab (press Esc to stop) and play it back at any speed. Macros are saved with the profile.</li>
         </ol>
         <br/>
         <b>Important:</b> The application will minimize to the system tray when you close the window (this can be changed in Preferences). Right-click the tray icon to show the window or quit the application.
         <br/><br/>
         <b>CPS Test Benchmarks</b>
         <p>Use the included <code>cps_test.html</code> to test your settings. You can use this table for reference.</p>
+        <p>Clicks are scheduled on absolute deadlines, so the achieved CPS stays within 1% of 1 / interval over a run. Run <code>benchmarks/clicking.py</code> to measure it on your machine.</p>
         <table border="1" cellpadding="5" cellspacing="0" style="width:100%; border-collapse: collapse; border: 1px solid #555;">
             <tr align="left" style="background-color:#3C3C3C;">
                 <th style="padding:5px;">Test Duration</th>
@@ -524,109 +1047,34 @@ class AutoClickerProQT(QWidget):
         instructions_label.setStyleSheet("padding: 10px;") # Add some padding
         instructions_label.setOpenExternalLinks(True)
         instructions_layout.addWidget(instructions_label)
-        tabs.addTab(instructions_tab, "Instructions")
-
-        # Status & Countdown Windows
-        self.status_window = QWidget(); self.status_window.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool); self.status_window.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        status_layout = QVBoxLayout(self.status_window); self.status_window.setLayout(status_layout)
-        self.left_status_label = QLabel(""); self.left_status_label.setStyleSheet("background-color: red; color: white; font-weight: bold; padding: 2px;")
-        status_layout.addWidget(self.left_status_label)
-        self.right_status_label = QLabel(""); self.right_status_label.setStyleSheet("background-color: red; color: white; font-weight: bold; padding: 2px;")
-        status_layout.addWidget(self.right_status_label)
-        self.countdown_label = QLabel(""); self.countdown_label.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool); self.countdown_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground); self.countdown_label.setStyleSheet("background-color: rgba(0,0,0,180); color: white; font-weight: bold; font-size: 48pt; padding: 20px; border-radius: 10px;")
-
-    def smooth_move(self, x, y):
-        start_pos = self.mouse_controller.position
-        move_x = x - start_pos[0]
-        move_y = y - start_pos[1]
-        
-        steps = 10 
-        duration = 0.02 
-        
-        for i in range(1, steps + 1):
-            step_x = start_pos[0] + (move_x * i) / steps
-            step_y = start_pos[1] + (move_y * i) / steps
-            self.mouse_controller.position = (int(step_x), int(step_y))
-            time.sleep(duration / steps)
-
-    def smooth_move_win32(self, x, y):
-        if not CAN_USE_WIN32: return
 
-        start_x, start_y = win32api.GetCursorPos()
+    def input_backend_name(self):
+        if CAN_USE_WIN32 and self.prefs["use_win32_input"]:
+            return "win32"
+        if sys.platform.startswith("linux") and self.prefs["linux_input"] in LINUX_BACKENDS:
+            return self.prefs["linux_input"]
+        return "pynput"
 
-        total_dx = x - start_x
-        total_dy = y - start_y
-
-        steps = 15
-        duration = 0.03
-
-        if steps <= 0: return
-
-        step_dx = total_dx / steps
-        step_dy = total_dy / steps
-
-        for _ in range(steps):
-            win32api.mouse_event(win32con.MOUSEEVENTF_MOVE, int(step_dx), int(step_dy), 0, 0)
-            time.sleep(duration / steps)
-
-    def click_win32(self, button):
-        if not CAN_USE_WIN32: return
-
-        if button == mouse.Button.left:
-            down_event = win32con.MOUSEEVENTF_LEFTDOWN
-            up_event = win32con.MOUSEEVENTF_LEFTUP
-        elif button == mouse.Button.right:
-            down_event = win32con.MOUSEEVENTF_RIGHTDOWN
-            up_event = win32con.MOUSEEVENTF_RIGHTUP
-        else:
-            return 
-
-        x, y = win32api.GetCursorPos()
-        win32api.mouse_event(down_event, x, y, 0, 0)
-        time.sleep(0.01)
-        win32api.mouse_event(up_event, x, y, 0, 0)
-
-    def key_to_str(self, key):
-        if key is None: return None
-        if isinstance(key, keyboard.Key): return key.name
-        if isinstance(key, keyboard.KeyCode): return key.char
-        return None
-
-    def str_to_key(self, key_str):
-        if key_str is None: return None
-        try: return keyboard.Key[key_str]
-        except KeyError: return keyboard.KeyCode.from_char(key_str.replace("'", ""))
+    def create_input_backend(self, name):
+        # One backend of each kind is shared by every run; a new uinput device takes a moment to be picked up
+        backend = self.input_backends.get(name)
+        if backend is None:
+            backend = self.input_backends[name] = create_backend(name); backend.cursor = self.cursor
+        return backend
 
     def get_current_settings(self, is_template=False):
         def get_widget_settings(widget):
-            s = {
-                "enabled": False, "trigger_key": None, "is_random": False, 
-                "interval": "0.1", "min_interval": "0.1", "max_interval": "0.5", 
-                "num_clicks": "0", "activation_mode": "Toggle",
-                "randomize_pos": False, "randomize_radius": 5
-            }
-            if not is_template:
-                s.update({
-                    "enabled": widget.enable_button.isChecked(), 
-                    "trigger_key": self.key_to_str(widget.trigger_key), 
-                    "is_random": widget.random_interval_check.isChecked(), 
-                    "interval": widget.interval_entry.text(), 
-                    "min_interval": widget.min_interval_entry.text(), 
-                    "max_interval": widget.max_interval_entry.text(), 
-                    "num_clicks": widget.clicks_entry.text(), 
-                    "activation_mode": widget.activation_mode_combo.currentText(),
-                    "randomize_pos": widget.random_pos_check.isChecked(),
-                    "randomize_radius": widget.radius_spinbox.value()
-                })
-            return s
-        prefs = {key: w.isChecked() for key, w in self.prefs.items() if isinstance(w, QCheckBox)}
-        prefs["countdown_seconds"] = self.prefs["countdown_seconds"].value()
-        return {"left": get_widget_settings(self.left_frame), "right": get_widget_settings(self.right_frame), "prefs": prefs}
+            return dict(DEFAULT_CLICKER_SETTINGS) if is_template else widget.get_settings()
+        macros = {} if is_template else self.macro_panel.get_settings()
+        return {"left": get_widget_settings(self.left_frame), "right": get_widget_settings(self.right_frame), "prefs": dict(self.prefs), "macros": macros}
 
     def load_settings_to_ui(self, settings):
         def set_widget_settings(widget, s):
             widget.enable_button.setChecked(s.get("enabled", False))
-            widget.trigger_key = self.str_to_key(s.get("trigger_key"))
+            try:
+                widget.trigger_key = normalize_chord(s.get("trigger_key"))
+            except ValueError as e:
+                print(f"{e}. The trigger is cleared."); widget.trigger_key = None
             widget.set_key_button.setText(f"Trigger: {widget.get_trigger_key_str()}")
             widget.random_interval_check.setChecked(s.get("is_random", False))
             widget.interval_entry.setText(s.get("interval", "0.1"))
@@ -636,39 +1084,76 @@ class AutoClickerProQT(QWidget):
             widget.activation_mode_combo.setCurrentText(s.get("activation_mode", "Toggle"))
             widget.random_pos_check.setChecked(s.get("randomize_pos", False))
             widget.radius_spinbox.setValue(s.get("randomize_radius", 5))
+            widget.missed_policy_combo.setCurrentText(s.get("missed_policy", "Catch Up"))
+            widget.seed_entry.setText(s.get("random_seed", ""))
+            widget.move_mode_combo.setCurrentText(s.get("move_mode", "Linear"))
+            try:
+                parse_points(s.get("sequence", []), widget.button); widget.sequence = [dict(p) for p in s.get("sequence", [])]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping the click sequence of the {widget.title}: {e}"); widget.sequence = []
+            widget.refresh_point_list()
+            widget.sequence_check.setChecked(s.get("sequence_enabled", False))
+            widget.optimize_check.setChecked(s.get("optimize_order", False))
+            try:
+                parse_regions(s.get("watch_regions", [])); widget.watch_regions = [dict(r) for r in s.get("watch_regions", [])]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping the watched regions of the {widget.title}: {e}"); widget.watch_regions = []
+            widget.refresh_region_list()
+            widget.watch_check.setChecked(s.get("watch_enabled", False))
         set_widget_settings(self.left_frame, settings["left"])
         set_widget_settings(self.right_frame, settings["right"])
         if "prefs" in settings:
-            for key, w in self.prefs.items():
-                if isinstance(w, QCheckBox): w.setChecked(settings["prefs"].get(key, True))
-                if isinstance(w, QSpinBox): w.setValue(settings["prefs"].get(key, 3))
+            self.prefs = {key: settings["prefs"].get(key, default) for key, default in DEFAULT_PREFS.items()}
+            self.sync_pref_widgets()
+        self.macro_panel.load_settings(settings.get("macros", {}))
+        self.rebuild_triggers()
+        self.rebuild_watcher()
+
+    def rebuild_triggers(self):
+        # The hook only emits; handle_key_press/release read widgets, so they must run on the GUI thread
+        self.triggers.rebuild((frame.trigger_key, frame.comm.trigger_pressed.emit, frame.comm.trigger_released.emit) for frame in (self.left_frame, self.right_frame))
+
+    def rebuild_watcher(self, *args):
+        """ Watch the regions of every enabled clicker that has watching on; stops the watcher when there are none. """
+        regions = []
+        for frame in (self.left_frame, self.right_frame):
+            if not (frame.enable_button.isChecked() and frame.watch_check.isChecked()): continue
+            try:
+                regions += [(frame, region) for region in parse_regions(frame.watch_regions)]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Not watching the regions of the {frame.title}: {e}")
+        if not regions:
+            if self.watcher: self.watcher.stop()
+            return
+        if self.watcher is None:
+            try:
+                self.watcher = RegionWatcher(create_capture(), self.on_region_changed, self.prefs["watch_fps"])
+            except ImportError as e:
+                print(f"Cannot watch screen regions: {e}"); return
+        self.watcher.set_regions(regions); self.watcher.start()
+
+    def on_region_changed(self, frame, matched):
+        # Called on the watcher thread; a match acts like the clicker's trigger key going down
+        (frame.comm.trigger_pressed if matched else frame.comm.trigger_released).emit()
 
     def load_profiles(self):
-        if os.path.exists(self.profile_file):
-            try:
-                with open(self.profile_file, 'r') as f: self.profiles = json.load(f)
-            except json.JSONDecodeError:
-                print("Error reading profiles.json. Creating a default profile.")
-                self.profiles = {"Default": self.get_current_settings(is_template=True)}
-        else: self.profiles = {"Default": self.get_current_settings(is_template=True)}
-        self.profile_list.clear(); self.profile_list.addItems(self.profiles.keys())
+        if len(self.profile_store) == 0:
+            self.profile_store.put("Default", self.get_current_settings(is_template=True))
+        self.profile_list.clear(); self.profile_list.addItems(self.profile_store.names())
         if self.profile_list.count() > 0: self.profile_list.setCurrentRow(0)
 
-    def save_profiles(self):
-        with open(self.profile_file, 'w') as f: json.dump(self.profiles, f, indent=4)
-
     def new_profile(self):
         name, ok = QInputDialog.getText(self, "New Profile", "Enter profile name:")
-        if ok and name and name not in self.profiles:
-            self.profiles[name] = self.get_current_settings() # Save current settings for new profile
-            self.profile_list.addItem(name); self.profile_list.setCurrentRow(self.profile_list.count() - 1); self.save_profiles()
+        if ok and name and name not in self.profile_store:
+            self.profile_store.put(name, self.get_current_settings()) # Save current settings for new profile
+            self.profile_list.addItem(name); self.profile_list.setCurrentRow(self.profile_list.count() - 1)
 
     def save_profile(self):
         current_item = self.profile_list.currentItem()
         if not current_item: return
         name = current_item.text()
-        self.profiles[name] = self.get_current_settings()
-        self.save_profiles(); QMessageBox.information(self, "Success", f"Profile '{name}' saved.")
+        self.profile_store.put(name, self.get_current_settings())
+        QMessageBox.information(self, "Success", f"Profile '{name}' saved.")
 
     def delete_profile(self):
         current_item = self.profile_list.currentItem()
@@ -677,46 +1162,115 @@ class AutoClickerProQT(QWidget):
             return
         name = current_item.text()
         if QMessageBox.question(self, "Delete Profile", f"Are you sure you want to delete '{name}'?") == QMessageBox.StandardButton.Yes:
-            del self.profiles[name]; self.profile_list.takeItem(self.profile_list.row(current_item)); self.save_profiles()
+            self.profile_store.delete(name); self.profile_list.takeItem(self.profile_list.row(current_item))
 
     def load_selected_profile(self, current, previous):
-        if current: self.load_settings_to_ui(self.profiles[current.text()])
+        if not current: return
+        settings = self.profile_store.get(current.text())
+        if settings: self.load_settings_to_ui(settings)
 
     def update_on_screen_display(self):
-        if not self.prefs["show_notification"].isChecked(): self.status_window.hide(); return
-        left_on, right_on = self.left_frame.clicking, self.right_frame.clicking
-        if left_on: self.left_status_label.setText(f"Left Clicker ON ({self.left_frame.get_trigger_key_str()})")
-        self.left_status_label.setVisible(left_on)
-        if right_on: self.right_status_label.setText(f"Right Clicker ON ({self.right_frame.get_trigger_key_str()})")
-        self.right_status_label.setVisible(right_on)
-        if left_on or right_on: self.status_window.adjustSize(); self.status_window.move(10, 10); self.status_window.show()
-        else: self.status_window.hide()
-
-    def show_countdown(self, num):
-        self.countdown_label.setText(str(num)); self.countdown_label.adjustSize(); self.countdown_label.show()
-
-    def hide_countdown(self):
-        self.countdown_label.hide()
+        """ Show or hide the overlay after a clicker starts or stops; the timer does the rest. """
+        if not self.prefs["show_notification"] or not (self.left_frame.clicking or self.right_frame.clicking):
+            self.overlay_timer.stop(); self.status_window.hide(); return
+        self.refresh_overlay()
+        if not self.overlay_timer.isActive(): self.overlay_timer.start(1000 // max(1, self.prefs["overlay_fps"]))
+        if not self.status_window.isVisible(): self.status_window.show()
+
+    def refresh_overlay(self):
+        rows = []
+        for frame, name in ((self.left_frame, "Left"), (self.right_frame, "Right")):
+            if not frame.clicking: continue
+            text = f"{name} ON ({frame.get_trigger_key_str()})"
+            stats = self.engine.snapshot(frame)
+            if stats:
+                text += f" | {stats['clicks']} clicks"
+                if stats["clicks"] > 1: text += f" | {stats['cps']:.1f} CPS | p95 {stats['jitter_p95_ms']:.2f} ms | missed {stats['missed']}"
+            rows.append((text, self.clicker_row_color))
+        hook = self.triggers.timings.snapshot()
+        if hook["calls"]: rows.append((f"Key hook: p50 {hook['p50_us']:.1f} / p99 {hook['p99_us']:.1f} / max {hook['max_us']:.1f} µs", self.info_row_color))
+        self.status_window.set_rows(tuple(rows))
+
+    def toggle_trace(self):
+        """ Start recording the click timeline, or stop and save it as a Chrome trace for Perfetto. """
+        if self.engine.tracer is None:
+            self.engine.start_trace(); self.trace_action.setText("Stop Tracing and Save"); return
+        tracer = self.engine.stop_trace(); self.trace_action.setText("Start Tracing")
+        try:
+            path = os.path.abspath(tracer.write_chrome_trace(default_trace_path()))
+        except OSError as e:
+            QMessageBox.warning(self, "Trace Not Saved", f"Could not write the trace: {e}"); return
+        self.tray_icon.showMessage("Trace Saved", f"{min(tracer.count, tracer.capacity)} events in {path}. Open it in ui.perfetto.dev.")
+
+    def toggle_profiler(self):
+        """ Start sampling the stacks of every thread, or stop and save them for a flame graph. """
+        if not self.sampler.running:
+            self.sampler.start(); self.profile_action.setText("Stop Profiling and Save"); return
+        sampler = self.sampler.stop(); self.profile_action.setText("Start Profiling")
+        try:
+            path = os.path.abspath(sampler.write(default_profile_path()))
+        except OSError as e:
+            QMessageBox.warning(self, "Profile Not Saved", f"Could not write the thread profile: {e}"); return
+        self.tray_icon.showMessage("Profile Saved", f"{sampler.samples} samples of every thread in {path}. Render it with flamegraph.pl or speedscope.")
+
+    # --- DELAYED STARTS ---
+    def countdown_deadline(self, frame):
+        """ Deadline for a countdown start: the one another clicker is already counting down to, so they start in phase. """
+        now = time.perf_counter_ns()
+        for other in (self.left_frame, self.right_frame):
+            if other is not frame and other.is_pending(now): return other.start_ns
+        return now + self.prefs["countdown_seconds"] * 1_000_000_000
+
+    def schedule_start(self):
+        try:
+            start_ns = perf_ns_at(parse_clock_time(self.start_time_entry.text()))
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Start Time", str(e)); return
+        frames = [frame for frame in (self.left_frame, self.right_frame) if frame.enable_button.isChecked()]
+        if not frames:
+            QMessageBox.warning(self, "Nothing to Start", "Enable at least one clicker first."); return
+        for frame in frames:
+            frame.stop_clicking(); frame.start_clicking(start_ns)
+
+    def refresh_countdown(self):
+        """ Show the time left until the nearest pending start, computed from its deadline. """
+        now = time.perf_counter_ns()
+        pending = [frame.start_ns for frame in (self.left_frame, self.right_frame) if frame.is_pending(now)]
+        for frame in (self.left_frame, self.right_frame): frame.show_status()
+        if not pending:
+            self.countdown_timer.stop(); self.countdown_label.hide(); return
+        seconds = -(-(min(pending) - now) // 1_000_000_000)
+        text = str(seconds) if seconds < 60 else f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+        if self.countdown_label.text() != text:
+            self.countdown_label.setText(text); self.countdown_label.adjustSize()
+        if not self.countdown_label.isVisible(): self.countdown_label.show()
+        if not self.countdown_timer.isActive(): self.countdown_timer.start()
 
     def init_listeners(self):
-        self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release); self.keyboard_listener.daemon = True; self.keyboard_listener.start()
+        try:
+            from pynput import keyboard
+        except ImportError as e:
+            print(f"Could not load pynput ({e}). Trigger keys are disabled.")
+            for frame in (self.left_frame, self.right_frame): frame.set_key_button.setDisabled(True)
+            return
+        self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release); self.keyboard_listener.daemon = True; self.keyboard_listener.name = "KeyboardListener"; self.keyboard_listener.start()
+        # Clicks around the cursor read it from this cache rather than from the display server per click
+        self.cursor.start()
 
     def on_press(self, key):
-        if self.left_frame.trigger_key is not None and key == self.left_frame.trigger_key: self.left_frame.handle_key_press()
-        if self.right_frame.trigger_key is not None and key == self.right_frame.trigger_key: self.right_frame.handle_key_press()
+        self.triggers.press(key)
 
     def on_release(self, key):
-        if self.left_frame.trigger_key is not None and key == self.left_frame.trigger_key: self.left_frame.handle_key_release()
-        if self.right_frame.trigger_key is not None and key == self.right_frame.trigger_key: self.right_frame.handle_key_release()
+        self.triggers.release(key)
 
     def closeEvent(self, event):
         # Save current profile before closing
         current_item = self.profile_list.currentItem()
         if current_item:
-            self.profiles[current_item.text()] = self.get_current_settings()
-            self.save_profiles()
+            self.profile_store.put(current_item.text(), self.get_current_settings())
+            self.profile_store.flush()
 
-        if self.prefs["ask_on_close"].isChecked():
+        if self.prefs["ask_on_close"]:
             msg_box = QMessageBox(self)
             msg_box.setWindowTitle("Exit Autoclicker Pro")
             msg_box.setText("What would you like to do?")
@@ -738,11 +1292,21 @@ class AutoClickerProQT(QWidget):
             event.ignore()
 
     def quit_app(self):
-        self.tray_icon.hide(); QApplication.instance().quit()
+        if self.watcher: self.watcher.stop()
+        self.engine.stop_all()
+        for backend in self.input_backends.values(): backend.close()
+        self.cursor.stop()
+        if self.sampler.running: self.toggle_profiler()
+        self.profile_store.close(); self.audio.close(); self.tray_icon.hide(); QApplication.instance().quit()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     app.setStyleSheet(STYLESHEET)
     ex = AutoClickerProQT()
     ex.show()
+    if "--measure-startup" in sys.argv:
+        # Used by benchmarks/startup.py: report once the first window is up, then leave without saving anything
+        def report_first_window():
+            print(f"first_window {time.time()}", flush=True); app.exit(0)
+        QTimer.singleShot(0, report_first_window)
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,94 @@
+""" Sustained click rate of an input backend through the real engine.
+
+Clicks at a fixed interval with the chosen backend and reports the achieved CPS, the
+interval jitter, the flushes per click and the CPU time used per second of clicking.
+On X11 the clicks are also counted where they land: a window covering the screen
+selects button presses on a second connection, so dropped input shows up as
+delivered < sent. Needs a display; on a headless machine run it under Xvfb:
+
+    xvfb-run -s "-screen 0 1280x720x24" python benchmarks/backends.py --backend xtest --interval 0.0005
+
+The uinput backend works under Xvfb too, but Xvfb does not read input devices, so
+nothing is counted as delivered there.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoclicker.backends import BACKENDS, create_backend
+from autoclicker.config import ClickerConfig
+from autoclicker.engine import ClickEngine
+
+class DeliveryCounter:
+    """ Counts ButtonPress events reaching a screen-sized X window. """
+    def __init__(self):
+        from Xlib import X, display
+        self.X = X
+        self.display = display.Display()
+        screen = self.display.screen()
+        self.window = screen.root.create_window(0, 0, screen.width_in_pixels, screen.height_in_pixels, 0, screen.root_depth,
+                                                event_mask=X.ButtonPressMask, override_redirect=True)
+        self.window.map(); self.display.sync()
+        self.width, self.height = screen.width_in_pixels, screen.height_in_pixels
+
+    def count(self):
+        self.display.sync()
+        presses = 0
+        while self.display.pending_events():
+            if self.display.next_event().type == self.X.ButtonPress: presses += 1
+        return presses
+
+    def close(self):
+        self.window.destroy(); self.display.close()
+
+def run(backend_name, interval, duration):
+    counter = None
+    try:
+        counter = DeliveryCounter()
+    except Exception as e:
+        print(f"Not counting delivered clicks: {e}", file=sys.stderr)
+    backend = create_backend(backend_name)
+    flushes = [0]
+    flush = backend.flush
+    def counting_flush():
+        flushes[0] += 1; flush()
+    backend.flush = counting_flush
+    if counter: backend.move(counter.width // 2, counter.height // 2); backend.flush()
+
+    engine = ClickEngine()
+    cpu_start = time.process_time(); wall_start = time.perf_counter()
+    engine.start_clicker("left", ClickerConfig("left", backend_name, interval=interval), backend)
+    time.sleep(duration)
+    stats = engine.snapshot("left"); engine.stop_job("left")
+    cpu = time.process_time() - cpu_start; wall = time.perf_counter() - wall_start
+    time.sleep(0.1) # Let the X server drain what was sent last
+    delivered = counter.count() if counter else None
+    if counter: counter.close()
+    backend.close()
+    return {
+        "backend": backend_name, "sent": stats["clicks"], "delivered": delivered,
+        "cps": round(stats["cps"], 1), "expected_cps": round(1 / interval, 1),
+        "jitter_p95_ms": round(stats["jitter_p95_ms"], 4), "missed": stats["missed"],
+        "flushes_per_click": round(flushes[0] / max(1, stats["clicks"]), 3),
+        "cpu_ms_per_s": round(cpu * 1000 / wall, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=sorted(name for name in BACKENDS if name != "recording"), default="xtest")
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between clicks (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds to click (default: %(default)s)")
+    args = parser.parse_args()
+    try:
+        result = run(args.backend, args.interval, args.duration)
+    except (ImportError, ValueError) as e:
+        print(f"Cannot use the {args.backend} backend: {e}", file=sys.stderr); return 1
+    print(json.dumps(result, indent=4))
+    return 0 if result["delivered"] in (None, result["sent"]) or args.backend == "uinput" else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
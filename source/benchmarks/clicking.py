@@ -0,0 +1,141 @@
+""" Click loop benchmark against the recording backend.
+
+Runs the real engine for every scenario below with a RecordingBackend in place of the
+mouse, so it works on a headless machine, and reports the achieved CPS, the interval
+jitter, missed deadlines and the CPU time the process used per second of clicking.
+
+    python benchmarks/clicking.py [--duration S] [--only NAME ...] [--json] [--save FILE] [--baseline FILE]
+
+With --baseline, every scenario that clicks slower, jitters more or uses more CPU than
+the saved run by more than --tolerance is listed and the script exits with status 1.
+It does the same when a fixed-interval scenario misses its expected CPS by more than
+the engine's CPS_TOLERANCE.
+With --json as well, stdout is a single object holding "results", the "comparison"
+of every figure and the list of "regressions".
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoclicker.backends import RecordingBackend
+from autoclicker.config import ClickerConfig, DEFAULT_CLICKER_SETTINGS
+from autoclicker.engine import ClickEngine
+from autoclicker.sampling import load_numpy
+from autoclicker.scheduler import CPS_TOLERANCE
+
+# name: settings of each clicker that runs in the scenario
+SCENARIOS = {
+    "interval_0.1": {"left": {"interval": "0.1"}},
+    "interval_0.05": {"left": {"interval": "0.05"}},
+    "interval_0.01": {"left": {"interval": "0.01"}},
+    "interval_0.001": {"left": {"interval": "0.001"}},
+    "random_0.01-0.02": {"left": {"is_random": True, "min_interval": "0.01", "max_interval": "0.02", "random_seed": "1"}},
+    "randomize_pos_0.01": {"left": {"interval": "0.01", "randomize_pos": True, "randomize_radius": 20, "random_seed": "1"}},
+    "both_clickers_0.01": {"left": {"interval": "0.01"}, "right": {"interval": "0.01"}},
+}
+
+# Lower is worse for cps, higher is worse for the rest
+HIGHER_IS_BETTER = ("cps",)
+COMPARED = ("cps", "jitter_p95_ms", "cpu_ms_per_s")
+# Changes this small are mostly scheduler noise, so a value has to grow by this much as well
+SLACK = {"jitter_p95_ms": 0.5, "cpu_ms_per_s": 20}
+
+def expected_cps(settings):
+    if settings.get("is_random"):
+        # The mean of a uniform interval; CPS is the rate at that mean
+        return 2 / (float(settings["min_interval"]) + float(settings["max_interval"]))
+    return 1 / float(settings["interval"])
+
+def off_rate_scenarios(results):
+    """ Fixed-interval scenarios whose CPS is further from 1 / interval than CPS_TOLERANCE; random intervals only hold it on average. """
+    return [name for name, r in results.items()
+            if not any(c.get("is_random") for c in SCENARIOS[name].values()) and abs(r["cps_error"]) > CPS_TOLERANCE]
+
+def run_scenario(clickers, duration):
+    engine = ClickEngine()
+    backends = {}; stats = {}
+    cpu_start = time.process_time(); wall_start = time.perf_counter()
+    for button, overrides in clickers.items():
+        config = ClickerConfig.from_settings(dict(DEFAULT_CLICKER_SETTINGS, **overrides), button, "recording")
+        backends[button] = RecordingBackend(start_pos=(500, 500))
+        engine.start_clicker(button, config, backends[button])
+    time.sleep(duration)
+    for button in clickers:
+        stats[button] = engine.snapshot(button); engine.stop_job(button)
+    cpu = time.process_time() - cpu_start; wall = time.perf_counter() - wall_start
+
+    result = {"cps": 0.0, "expected_cps": 0.0, "jitter_p50_ms": 0.0, "jitter_p95_ms": 0.0, "jitter_p99_ms": 0.0, "missed": 0}
+    for button, overrides in clickers.items():
+        times = backends[button].click_times()
+        # Rate between the first and last click, so start-up and stop do not count
+        result["cps"] += (len(times) - 1) * 1e9 / (times[-1] - times[0]) if len(times) > 1 else 0.0
+        result["expected_cps"] += expected_cps(dict(DEFAULT_CLICKER_SETTINGS, **overrides))
+        for key in ("jitter_p50_ms", "jitter_p95_ms", "jitter_p99_ms"): result[key] = max(result[key], stats[button][key])
+        result["missed"] += stats[button]["missed"]
+    result["cps_error"] = result["cps"] / result["expected_cps"] - 1
+    result["cpu_ms_per_s"] = cpu * 1000 / wall
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in result.items()}
+
+def measure(names, duration):
+    load_numpy() # Keep the one-off import out of the first scenario's CPU time
+    return {name: run_scenario(SCENARIOS[name], duration) for name in names}
+
+def compare(results, baseline, tolerance):
+    """ One {"scenario", "metric", "baseline", "result", "change", "worse"} dict per figure both runs have. """
+    changes = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old: continue
+        for key in COMPARED:
+            if not old.get(key): continue
+            change = (result[key] - old[key]) / old[key]
+            if key in HIGHER_IS_BETTER: worse = change < -tolerance
+            else: worse = result[key] > old[key] * (1 + tolerance) + SLACK.get(key, 0)
+            changes.append({"scenario": name, "metric": key, "baseline": old[key], "result": result[key], "change": round(change, 4), "worse": worse})
+    return changes
+
+def print_changes(changes):
+    for c in changes: print(f"{c['scenario']:20} {c['metric']:14} {c['baseline']:10.3f} -> {c['result']:10.3f} ({c['change']:+.1%})")
+
+def print_table(results):
+    print(f"{'scenario':20} {'CPS':>9} {'expected':>9} {'error':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'missed':>6} {'CPU ms/s':>8}")
+    for name, r in results.items():
+        print(f"{name:20} {r['cps']:9.1f} {r['expected_cps']:9.1f} {r['cps_error']:+7.1%} {r['jitter_p50_ms']:7.3f} {r['jitter_p95_ms']:7.3f} {r['jitter_p99_ms']:7.3f} {r['missed']:6} {r['cpu_ms_per_s']:8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds to click in each scenario (default: %(default)s)")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), metavar="NAME", help="run only these scenarios")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed change against the baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = measure(args.only or list(SCENARIOS), args.duration)
+    if args.save:
+        with open(args.save, 'w') as f: json.dump(results, f, indent=4)
+    changes = regressions = None
+    off_rate = off_rate_scenarios(results)
+    if args.baseline:
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        changes = compare(results, baseline, args.tolerance)
+        regressions = [f"{c['scenario']}.{c['metric']}" for c in changes if c["worse"]]
+    if args.json:
+        # With a baseline the comparison goes into the same document, so stdout stays one JSON value
+        print(json.dumps(results if changes is None else {"results": results, "comparison": changes, "regressions": regressions}, indent=4))
+    else:
+        print_table(results)
+        if changes is not None: print_changes(changes)
+        if regressions: print(f"Worse than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+    if off_rate:
+        # On stderr with --json, so stdout stays one JSON value
+        print(f"CPS off by more than {CPS_TOLERANCE:.0%}: {', '.join(off_rate)}", file=sys.stderr if args.json else sys.stdout)
+    return 1 if regressions or off_rate else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
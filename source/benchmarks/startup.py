@@ -0,0 +1,122 @@
+""" Startup benchmark for the GUI and the headless runner.
+
+Reports the total of `python -X importtime` for each entry point, the ten slowest
+top-level imports, and the wall time from process launch to the first shown window.
+
+    python benchmarks/startup.py [--runs N] [--json] [--save FILE] [--baseline FILE]
+
+With --baseline, every timing that is more than --tolerance slower than the saved
+one is listed and the script exits with status 1.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_SCRIPT = os.path.join(SOURCE_DIR, "autoclicker_v1.2.py")
+# "import time:   self [us] |   cumulative | <indent>package", indent grows by 2 per nesting level
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+ENTRY_POINTS = {
+    # The GUI file is run without its __main__ block, so only its imports are timed.
+    "gui": f"import runpy; runpy.run_path({GUI_SCRIPT!r}, run_name='__startup_probe__')",
+    "cli": "import autoclicker.cli",
+}
+
+def child_env():
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+def import_times(code):
+    """ Return (total_ms, {top-level module: cumulative_ms}) for one run of `code`, or None if it failed. """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=SOURCE_DIR, env=child_env(), capture_output=True, text=True)
+    if proc.returncode != 0: return None
+    total = 0; top_level = {}
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if not m: continue
+        total += int(m.group(1))
+        if len(m.group(3)) == 1: top_level[m.group(4)] = int(m.group(2)) / 1000
+    return total / 1000, top_level
+
+def time_to_first_window():
+    """ Wall time in ms from launching the GUI until it reports its first window, or None. """
+    start = time.time()
+    proc = subprocess.run([sys.executable, GUI_SCRIPT, "--measure-startup"], cwd=SOURCE_DIR, env=child_env(), capture_output=True, text=True, timeout=60)
+    for line in proc.stdout.splitlines():
+        if line.startswith("first_window "):
+            return (float(line.split()[1]) - start) * 1000
+    return None
+
+def time_cli_ready():
+    """ Wall time in ms for the headless runner to start, parse its arguments and exit. """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-m", "autoclicker", "--help"], cwd=SOURCE_DIR, env=child_env(), capture_output=True)
+    return (time.perf_counter() - start) * 1000 if proc.returncode == 0 else None
+
+def median_of(samples):
+    samples = [s for s in samples if s is not None]
+    return round(statistics.median(samples), 2) if samples else None
+
+def measure(runs):
+    results = {}
+    for name, code in ENTRY_POINTS.items():
+        samples = [import_times(code) for _ in range(runs)]
+        ok = [s for s in samples if s is not None]
+        if not ok:
+            results[f"{name}_import_ms"] = None; continue
+        results[f"{name}_import_ms"] = median_of([total for total, _ in ok])
+        slowest = sorted(ok[-1][1].items(), key=lambda item: item[1], reverse=True)[:10]
+        results[f"{name}_slowest_imports"] = {module: round(ms, 2) for module, ms in slowest}
+    results["gui_first_window_ms"] = median_of([time_to_first_window() for _ in range(runs)])
+    results["cli_ready_ms"] = median_of([time_cli_ready() for _ in range(runs)])
+    return results
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key)
+        if not key.endswith("_ms") or value is None or not old: continue
+        change = (value - old) / old
+        print(f"{key:24} {old:9.2f} -> {value:9.2f} ms ({change:+.1%})")
+        if change > tolerance: regressions.append(key)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="runs per measurement, the median is reported (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for key, value in results.items():
+            if isinstance(value, dict):
+                print(f"{key}:")
+                for module, ms in value.items(): print(f"    {module:30} {ms:9.2f} ms")
+            else:
+                print(f"{key:24} {'unavailable' if value is None else f'{value:9.2f} ms'}")
+    if args.save:
+        with open(args.save, 'w') as f: json.dump(results, f, indent=4)
+    if args.baseline:
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+""" Start/stop stress test for the click engine.
+
+Toggles clickers thousands of times with random gaps, the way fast trigger presses do,
+and checks two things on every run:
+
+  * no stale clicks: nothing a run clicks lands after stop_job() (or the start that
+    replaced it) has returned;
+  * bounded stop latency: how long stop_job() takes, which is how long the caller
+    waits until the run is guaranteed silent.
+
+    python benchmarks/stop_stress.py [--toggles N] [--interval S] [--max-latency-ms MS]
+
+Exits with status 1 when a stale click is seen or the p99 stop latency is over the bound.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoclicker.backends import InputBackend
+from autoclicker.config import ClickerConfig
+from autoclicker.engine import ClickEngine
+
+class RunBackend(InputBackend):
+    """ Records when each click of one run landed, to compare with when the run was stopped.
+
+    A click takes click_cost seconds and lands at the end, like a slow input call.
+    """
+    name = "stress"
+    # Long enough that a stop often arrives while a click is in progress
+    click_cost = 0.0002
+
+    def __init__(self):
+        self.clicks = []
+        self.x = self.y = 0
+
+    def press(self, button):
+        time.sleep(self.click_cost); self.clicks.append(time.perf_counter_ns())
+    def release(self, button): pass
+    def move(self, x, y): self.x, self.y = x, y
+    def position(self): return self.x, self.y
+
+def stress(toggles, interval, replace_share, seed):
+    rng = random.Random(seed)
+    engine = ClickEngine()
+    latencies = []
+    # (backend, when it had to be silent): the return of the stop_job() or start that ended its run
+    runs = []
+    # The other clicker keeps the engine busy the whole time, as a second clicker would
+    engine.start_clicker("other", ClickerConfig("right", interval=interval * 4), RunBackend())
+    running = None
+    for i in range(toggles):
+        backend = RunBackend()
+        engine.start_clicker("left", ClickerConfig("left", interval=interval), backend)
+        # A start over a running job replaces it; the old run must be silent from here on
+        if running is not None: runs.append((running, time.perf_counter_ns()))
+        running = backend
+        time.sleep(rng.uniform(0, 10 * interval))
+        if rng.random() < replace_share: continue
+        t0 = time.perf_counter_ns()
+        engine.stop_job("left")
+        stopped = time.perf_counter_ns()
+        latencies.append(stopped - t0)
+        runs.append((backend, stopped)); running = None
+        time.sleep(rng.uniform(0, interval))
+    engine.stop_all()
+    time.sleep(0.05)
+    stale = sum(1 for backend, silenced in runs for t in backend.clicks if t > silenced)
+    return stale, latencies, sum(len(backend.clicks) for backend, _ in runs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--toggles", type=int, default=3000, help="start/stop cycles (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=0.001, help="click interval of the toggled clicker (default: %(default)s)")
+    parser.add_argument("--replace", type=float, default=0.2, help="share of cycles that start over a running clicker instead of stopping it (default: %(default)s)")
+    parser.add_argument("--max-latency-ms", type=float, default=5.0, help="allowed p99 stop latency (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    stale, latencies, clicks = stress(args.toggles, args.interval, args.replace, args.seed)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1e6
+    print(f"{args.toggles} toggles, {clicks} clicks, {stale} stale clicks")
+    print(f"stop latency: median {statistics.median(latencies) / 1e6:.3f} ms, p99 {p99:.3f} ms, max {latencies[-1] / 1e6:.3f} ms")
+    failed = stale > 0 or p99 > args.max_latency_ms
+    if failed: print("FAILED")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
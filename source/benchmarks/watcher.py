@@ -0,0 +1,58 @@
+""" Region watcher benchmark against a synthetic screen.
+
+Watches a growing number of regions scattered over a full HD screen held in memory and
+reports the time per frame and the regions evaluated per frame, once with the tile diff
+(only regions under changed pixels are evaluated) and once evaluating every region.
+Each frame repaints one small patch, so most of the screen is static as it would be.
+
+    python benchmarks/watcher.py [--frames N] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoclicker.watcher import RegionWatcher, SyntheticCapture, WatchRegion
+
+SCREEN = (1920, 1080)
+REGION_COUNTS = (1, 16, 64, 256)
+REGION_SIZE = 24
+
+def run_case(count, frames, incremental):
+    capture = SyntheticCapture(*SCREEN)
+    watcher = RegionWatcher(capture, lambda key, matched: None)
+    rng = random.Random(count)
+    watcher.set_regions((i, WatchRegion(rng.randrange(SCREEN[0] - REGION_SIZE), rng.randrange(SCREEN[1] - REGION_SIZE),
+                                        REGION_SIZE, REGION_SIZE, "color", (255, 255, 255), 16, 0.5)) for i in range(count))
+    watcher.step()
+    times = []; evaluated = 0
+    for i in range(frames):
+        capture.fill(rng.randrange(SCREEN[0] - 8), rng.randrange(SCREEN[1] - 8), 8, 8, (i % 256,) * 3)
+        if not incremental: watcher.layout.primed = False
+        start = time.perf_counter_ns()
+        evaluated += watcher.step()
+        times.append(time.perf_counter_ns() - start)
+    return {"ms_per_frame": round(statistics.median(times) / 1e6, 3), "evaluated_per_frame": round(evaluated / frames, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=100, help="frames to time per case (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {f"{count}_regions": {"incremental": run_case(count, args.frames, True), "full": run_case(count, args.frames, False)}
+               for count in REGION_COUNTS}
+    if args.json:
+        print(json.dumps(results, indent=4)); return 0
+    print(f"{'case':12} {'tile diff ms':>12} {'evaluated':>9} {'full ms':>9} {'evaluated':>9}")
+    for name, r in results.items():
+        print(f"{name:12} {r['incremental']['ms_per_frame']:12.3f} {r['incremental']['evaluated_per_frame']:9} {r['full']['ms_per_frame']:9.3f} {r['full']['evaluated_per_frame']:9}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())